@@ -0,0 +1,93 @@
+"""
+Per-row cost of ORM -> view model conversion.
+
+Compares the previous recursive `__dict__` walk + `parse_obj` with the compiled read plans
+used by BaseRepository._model_to_pydantic.
+
+    python -m benchmarks.converters
+"""
+import timeit
+import warnings
+from datetime import datetime
+
+from sqlalchemy.orm import DeclarativeBase, collections
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.common.converters import get_read_plan
+from src.core.domain.events.dto import EventView
+from src.core.domain.events.event_members.dto import EventMemberView
+from src.core.domain.events.event_members.models import EventMembers
+from src.core.domain.events.models import Event
+from src.core.domain.roles.models import Role
+from src.core.domain.users.dto import UserView
+from src.core.domain.users.models import User
+
+ROWS = 1000
+ROUNDS = 5
+
+
+def legacy_model_to_dict(model):
+    model_dict = model.__dict__
+    for name, field in model_dict.items():
+        if isinstance(field, DeclarativeBase):
+            model_dict[name] = legacy_model_to_dict(field)
+        elif isinstance(field, collections.InstrumentedList):
+            model_dict[name] = [
+                legacy_model_to_dict(i) if isinstance(i, DeclarativeBase) else i for i in list(field)
+            ]
+    return model_dict
+
+
+def legacy_model_to_pydantic(model, view_model):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return view_model.parse_obj(legacy_model_to_dict(model))
+
+
+def loaded(model_class, **values):
+    """Builds an instance that looks like a row loaded from the database."""
+    model = model_class()
+    for name, value in values.items():
+        set_committed_value(model, name, value)
+    return model
+
+
+def make_event(i: int) -> Event:
+    return loaded(Event, id=i, name=f"event {i}", started_at=datetime(2030, 1, 1), finished_at=datetime(2030, 1, 2))
+
+
+def make_user(i: int) -> User:
+    role = loaded(Role, id=1, name="USER")
+    return loaded(User, id=i, first_name="first", username=f"user{i}", role_id=1, role=role)
+
+
+def make_member(i: int) -> EventMembers:
+    return loaded(EventMembers, id=i, event_id=i, user_id=i, event=make_event(i), user=make_user(i))
+
+
+CASES = [
+    ("EventView", make_event, EventView),
+    ("UserView", make_user, UserView),
+    ("EventMemberView", make_member, EventMemberView),
+]
+
+
+def bench(convert, factory, view_model) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        rows = [factory(i) for i in range(ROWS)]
+        elapsed = timeit.timeit(lambda: [convert(row, view_model) for row in rows], number=1)
+        best = min(best, elapsed)
+    return best / ROWS * 1_000_000
+
+
+def main() -> None:
+    print(f"{'view model':<18}{'legacy, us/row':>16}{'read plan, us/row':>20}{'speedup':>10}")
+    for name, factory, view_model in CASES:
+        legacy = bench(legacy_model_to_pydantic, factory, view_model)
+        compiled = bench(lambda row, view: get_read_plan(type(row), view)(row), factory, view_model)
+        print(f"{name:<18}{legacy:>16.2f}{compiled:>20.2f}{legacy / compiled:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
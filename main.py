@@ -1,17 +1,46 @@
 import asyncio
 import sys
+from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
 
 from src.api import api_router
+from src.common.container import container
+from src.core.domain import engine_registry
+from src.common.fastapi_jwt_auth.exceptions import AuthJWTException
+from src.core.domain.roles.service import RoleService
+from src.core.domain.tokens.service import TokenService
+from src.core.domain.users.passwords import password_hasher
+from src.db.consistency import ReadPositionMiddleware
+from src.settings import AuthSettings, get_settings
 
 origins = [
     '*'
 ]
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    settings = get_settings(AuthSettings)
+    await container.resolve(RoleService).load_registry()
+    token_service = container.resolve(TokenService)
+    await token_service.sync()
+    denylist_sync = asyncio.create_task(
+        token_service.run_sync(
+            settings.denylist_sync_interval,
+            settings.denylist_sweep_every,
+            settings.denylist_full_sync_every,
+        )
+    )
+    yield
+    denylist_sync.cancel()
+    password_hasher.shutdown()
+    await engine_registry.dispose()
+
+
 class EventAPI(FastAPI):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -21,15 +50,22 @@ def run_server():
     uvicorn.run("main:get_application", reload=True, host='0.0.0.0', port=8000)
 
 
+async def authjwt_exception_handler(_: Request, exc: AuthJWTException) -> JSONResponse:
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+
+
 def get_application():
-    app = EventAPI()
+    app = EventAPI(lifespan=lifespan)
     app.include_router(api_router)
+    app.add_exception_handler(AuthJWTException, authjwt_exception_handler)
+    app.add_middleware(ReadPositionMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
     return app
 
@@ -13,6 +13,7 @@ from src.settings import (
 __import__("src.core.domain.events.models")
 __import__("src.core.domain.users.models")
 __import__("src.core.domain.events.event_members.models")
+__import__("src.core.domain.tokens.models")
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
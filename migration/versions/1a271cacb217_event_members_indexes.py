@@ -0,0 +1,56 @@
+"""event_members_indexes
+
+Revision ID: 1a271cacb217
+Revises: 28c0c8d8758f
+Create Date: 2026-10-18 17:32:47.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a271cacb217'
+down_revision: Union[str, None] = '28c0c8d8758f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicate enrollments must go before the unique index can be built.
+    op.execute(
+        'DELETE FROM event_members WHERE id NOT IN '
+        '(SELECT min(id) FROM event_members GROUP BY event_id, user_id)'
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ux_event_members_event_id_user_id',
+            'event_members',
+            ['event_id', 'user_id'],
+            unique=True,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_event_members_user_id_event_id',
+            'event_members',
+            ['user_id', 'event_id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_event_members_user_id_event_id',
+            table_name='event_members',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ux_event_members_event_id_user_id',
+            table_name='event_members',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,31 @@
+"""data_versions
+
+Revision ID: 9c4e2d7f1a36
+Revises: 5e0b7c3a9d14
+Create Date: 2026-10-18 21:40:05.117402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2d7f1a36'
+down_revision: Union[str, None] = '5e0b7c3a9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    data_versions = op.create_table('data_versions',
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+    op.bulk_insert(data_versions, [{'scope': 'events', 'version': 1}])
+
+
+def downgrade() -> None:
+    op.drop_table('data_versions')
@@ -5,7 +5,7 @@ from sqlalchemyseed import load_entities_from_json
 from sqlalchemyseed import Seeder
 from dateutil.parser import parse
 
-from src.core.domain import db_engine
+from src.core.domain import PRIMARY, engine_registry
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -30,16 +30,14 @@ def convert_date(data):
 
 async def insert_value():
     try:
-        async with db_engine.session() as session:
-            async with session.begin():
-                seeder = Seeder(session)
-                roles_entities = load_entities_from_json(os.path.join(BASE_DIR, 'roles.json'))
-                users_entities = load_entities_from_json(os.path.join(BASE_DIR, 'users.json'))
-                events_entities = load_entities_from_json(os.path.join(BASE_DIR, 'events.json'))
-                convert_date(events_entities)
-                seeder.seed(roles_entities)
-                seeder.seed(users_entities)
-                seeder.seed(events_entities)
-                await seeder.session.commit()
+        async with engine_registry.get(PRIMARY).unit_of_work() as session:
+            seeder = Seeder(session)
+            roles_entities = load_entities_from_json(os.path.join(BASE_DIR, 'roles.json'))
+            users_entities = load_entities_from_json(os.path.join(BASE_DIR, 'users.json'))
+            events_entities = load_entities_from_json(os.path.join(BASE_DIR, 'events.json'))
+            convert_date(events_entities)
+            seeder.seed(roles_entities)
+            seeder.seed(users_entities)
+            seeder.seed(events_entities)
     except Exception as e:
         print(f'error: {e}')
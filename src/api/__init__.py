@@ -1,8 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from .dependencies import unit_of_work
 from .users import user_router
 from .events import event_router
+from .metrics import metrics_router
 
-api_router = APIRouter(prefix="/api/v1")
+api_router = APIRouter(prefix="/api/v1", dependencies=[Depends(unit_of_work)])
 api_router.include_router(router=user_router, prefix="/user")
 api_router.include_router(router=event_router, prefix="/events")
+api_router.include_router(router=metrics_router, prefix="/metrics")
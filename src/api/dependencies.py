@@ -0,0 +1,23 @@
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.common.container import container
+from src.core.domain import get_db_engine
+from src.core.domain.events.event_members.service import EventMemberService
+from src.core.domain.events.service import EventService
+from src.core.domain.tokens.service import TokenService
+from src.core.domain.users.service import UserService
+
+
+async def unit_of_work() -> AsyncIterator[None]:
+    """Runs the whole request in one session and transaction, committed before the response is sent."""
+    async with get_db_engine().unit_of_work():
+        yield
+
+
+EventServiceDep = Annotated[EventService, Depends(container.provider(EventService))]
+EventMemberServiceDep = Annotated[EventMemberService, Depends(container.provider(EventMemberService))]
+TokenServiceDep = Annotated[TokenService, Depends(container.provider(TokenService))]
+UserServiceDep = Annotated[UserService, Depends(container.provider(UserService))]
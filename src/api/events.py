@@ -1,12 +1,15 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Header, Query, Response
 from starlette import status
+from starlette.responses import StreamingResponse
 
+from src.api.dependencies import EventServiceDep
+from src.common.etag import etag_matches
+from src.common.pagination import decode_cursor
+from src.core.domain.events import dto
 from src.core.domain.events import requests
-from src.core.domain.events.event_members.response import EventMemberListResponse
-from src.core.domain.events.event_members.service import EventMemberService
-from src.core.domain.events.service import EventService
 from src.core.domain.events import errors
 from src.core.domain.roles.dto import RoleEnum
 from src.core.domain.users.auth import Auth
@@ -14,8 +17,9 @@ from src.core.domain.users.dto import UserView
 from src.core.domain.events import response
 
 event_router = APIRouter()
-service = EventService()
-event_member_service = EventMemberService()
+
+# clients keep the body but revalidate it with If-None-Match on every poll
+CACHE_CONTROL = 'no-cache'
 
 
 @event_router.get(
@@ -24,21 +28,55 @@ event_member_service = EventMemberService()
     tags=['Мероприятия'],
     name='Получить все мероприятия',
 )
-async def get_all_events() -> list[response.EventResponse]:
-    events = await service.get_all()
-    if events is None:
-        return []
-    return [
-        response.EventResponse(
-            id=event.id,
-            name=event.name,
-            started_at=event.started_at,
-            finished_at=event.finished_at,
-            members=[EventMemberListResponse(
-                name=member.user.first_name
-            ) for member in await event_member_service.get_members_by_event_id(event_id=event.id)]
-        ) for event in events
-    ]
+async def get_all_events(
+        http_response: Response,
+        service: EventServiceDep,
+        cursor: str | None = None,
+        limit: Annotated[int, Query(ge=1, le=dto.PAGE_SIZE_MAX)] = dto.PAGE_SIZE_DEFAULT,
+        started_from: Annotated[datetime | None, Query(alias='from')] = None,
+        finished_to: Annotated[datetime | None, Query(alias='to')] = None,
+        if_none_match: Annotated[str | None, Header()] = None,
+) -> list[response.EventResponse]:
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise errors.EventHTTPError(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Некорректный курсор'
+        )
+    etag = await service.get_etag('page', limit, started_from, finished_to, after)
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    page = await service.get_all_with_members(dto.EventPageQuery(
+        limit=limit,
+        started_from=started_from,
+        finished_to=finished_to,
+        after=after
+    ))
+    http_response.headers.update(headers)
+    if page.next_cursor:
+        http_response.headers['X-Next-Cursor'] = page.next_cursor
+    return page.items
+
+
+@event_router.get(
+    path='/export',
+    status_code=status.HTTP_200_OK,
+    tags=['Мероприятия'],
+    name='Выгрузить мероприятия с участниками',
+)
+async def export_events(
+        _: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN]))],
+        service: EventServiceDep,
+        export_format: Annotated[dto.ExportFormat, Query(alias='format')] = dto.ExportFormat.NDJSON,
+) -> StreamingResponse:
+    media_type = 'text/csv' if export_format == dto.ExportFormat.CSV else 'application/x-ndjson'
+    return StreamingResponse(
+        service.export(export_format),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename=events.{export_format.value}'}
+    )
 
 
 @event_router.get(
@@ -49,22 +87,22 @@ async def get_all_events() -> list[response.EventResponse]:
 )
 async def get_event(
         id: int,
+        http_response: Response,
+        service: EventServiceDep,
+        if_none_match: Annotated[str | None, Header()] = None,
 ) -> response.EventResponse:
-    event_model = await service.get(event_id=id)
-    if event_model is None:
+    etag = await service.get_etag('event', id)
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    event = await service.get_with_members(event_id=id)
+    if event is None:
         raise errors.EventHTTPError(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Мероприятие не найдено'
         )
-    return response.EventResponse(
-        id=event_model.id,
-        name=event_model.name,
-        started_at=event_model.started_at,
-        finished_at=event_model.finished_at,
-        members=[EventMemberListResponse(
-            name=member.user.first_name
-        ) for member in await event_member_service.get_members_by_event_id(event_id=event_model.id)]
-    )
+    http_response.headers.update(headers)
+    return event
 
 
 @event_router.post(
@@ -75,7 +113,8 @@ async def get_event(
 )
 async def create_event(
         request: requests.CreateEvent,
-        _: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN]))]
+        _: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN]))],
+        service: EventServiceDep,
 ):
     event_model = await service.create(request=request)
     if not event_model:
@@ -85,6 +124,24 @@ async def create_event(
         )
 
 
+@event_router.post(
+    path='/bulk',
+    status_code=status.HTTP_201_CREATED,
+    tags=['Мероприятия'],
+    name='Создать мероприятия списком',
+)
+async def create_events_bulk(
+        http_response: Response,
+        service: EventServiceDep,
+        items: Annotated[list[dict[str, Any]], Body(max_length=dto.BULK_CREATE_MAX)],
+        _: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN]))]
+) -> response.BulkCreateEventsResponse:
+    result = await service.create_many(items)
+    if not result.created and result.errors:
+        http_response.status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    return result
+
+
 @event_router.delete(
     path='/{id}',
     status_code=status.HTTP_204_NO_CONTENT,
@@ -93,7 +150,8 @@ async def create_event(
 )
 async def delete_event(
         id: int,
-        _: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN]))]
+        _: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN]))],
+        service: EventServiceDep,
 ):
     deleted_event = await service.delete(event_id=id)
     if not deleted_event:
@@ -0,0 +1,37 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from starlette import status
+
+from src.common.fastapi_jwt_auth import AuthJWT
+from src.core.domain import get_db_engine
+from src.core.domain.events.cache import events_cache
+from src.core.domain.roles.dto import RoleEnum
+from src.core.domain.tokens.denylist import token_denylist
+from src.core.domain.users.auth import Auth
+from src.core.domain.users.cache import users_cache
+from src.core.domain.users.passwords import password_hasher
+from src.core.domain.users.dto import UserView
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    path='/',
+    status_code=status.HTTP_200_OK,
+    tags=['Метрики'],
+    name='Получить метрики',
+)
+async def get_metrics(
+        _: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN]))]
+) -> dict:
+    return {
+        'db_pool': get_db_engine().pool_statistics(),
+        'db_replicas': await get_db_engine().replica_statistics(),
+        'db_statement_cache': get_db_engine().statement_cache_statistics(),
+        'events_cache': events_cache.statistics(),
+        'users_cache': users_cache.statistics(),
+        'password_hasher': password_hasher.statistics(),
+        'jwt_cache': AuthJWT.token_cache_statistics(),
+        'token_denylist': token_denylist.statistics(),
+    }
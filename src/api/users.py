@@ -1,24 +1,21 @@
-from datetime import timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from starlette import status
 
+from src.api.dependencies import EventMemberServiceDep, TokenServiceDep, UserServiceDep
 from src.common.fastapi_jwt_auth import AuthJWT
+from src.common.fastapi_jwt_auth.exceptions import AuthJWTException
 from src.core.domain.roles.dto import RoleEnum
 from src.core.domain.users import errors, requests, dto
 from src.core.domain.users.auth import Auth
 from src.core.domain.users.dto import UserView
-from src.core.domain.users.service import UserService
-from src.settings import ACCESS_TOKEN_EXPIRE_DAYS
+from src.settings import oauth2_scheme
 
 from src.core.domain.events.event_members import errors as event_member_errors
 from src.core.domain.events.event_members import response as event_member_response
-from src.core.domain.events.event_members.service import EventMemberService
 
 user_router = APIRouter()
-service = UserService()
-event_member_service = EventMemberService()
 
 
 @user_router.post(
@@ -29,6 +26,7 @@ event_member_service = EventMemberService()
 )
 async def signin(
         request: requests.AuthUser,
+        service: UserServiceDep,
         Authorize: AuthJWT = Depends()
 ) -> dto.Token:
     if request.username and request.password:
@@ -42,10 +40,8 @@ async def signin(
                 detail='Не удалось войти в личный кабинет',
                 headers={'WWW-Authenticate': 'Bearer'},
             )
-        access_token_expires = timedelta(days=int(ACCESS_TOKEN_EXPIRE_DAYS))
-        access_token = Authorize.create_access_token(subject=user_in_db.username, expires_time=access_token_expires)
-        refresh_token = Authorize.create_refresh_token(subject=user_in_db.username, expires_time=access_token_expires)
-        return dto.Token(access_token=access_token, refresh_token=refresh_token)
+        user = await service.get_by_username(user_in_db.username)
+        return service.issue_tokens(Authorize, user)
     else:
         raise errors.UsersHTTPError(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -60,13 +56,47 @@ async def signin(
     name='Обновить токен',
 )
 async def refresh(
+        service: UserServiceDep,
         Authorize: AuthJWT = Depends()
 ):
     Authorize.jwt_refresh_token_required()
 
-    current_user = Authorize.get_jwt_subject()
-    new_access_token = Authorize.create_access_token(subject=current_user)
-    return {"access_token": new_access_token}
+    # role claims are re-read from the database, so a refresh picks up role changes
+    user = await service.get_by_username(Authorize.get_jwt_subject())
+    if user is None:
+        raise errors.UsersHTTPError(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Пользователь не найден',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+    return {"access_token": service.issue_access_token(Authorize, user)}
+
+
+@user_router.post(
+    path='/logout',
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=['Пользователь'],
+    name='Выход из личного кабинета',
+)
+async def logout(
+        http_request: Request,
+        user: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN, RoleEnum.USER]))],
+        token: Annotated[str, Depends(oauth2_scheme)],
+        token_service: TokenServiceDep,
+        request: requests.Logout | None = None,
+):
+    await token_service.revoke(token, http_request.state.jwt_claims)
+    if request is not None and request.refresh_token:
+        try:
+            claims = AuthJWT().get_raw_jwt(request.refresh_token)
+        except AuthJWTException:
+            claims = None
+        if claims is None or claims.get('type') != 'refresh' or claims.get('sub') != user.username:
+            raise errors.UsersHTTPError(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail='Некорректный refresh токен'
+            )
+        await token_service.revoke(request.refresh_token, claims)
 
 
 @user_router.post(
@@ -77,6 +107,7 @@ async def refresh(
 )
 async def register_user(
         request: requests.RegisterUser,
+        service: UserServiceDep,
         Authorize: AuthJWT = Depends()
 ):
     user = await service.register(request, RoleEnum.USER.name)
@@ -86,10 +117,7 @@ async def register_user(
             detail='Не удалось зарегистрироваться',
             headers={'WWW-Authenticate': 'Bearer'},
         )
-    access_token_expires = timedelta(days=int(ACCESS_TOKEN_EXPIRE_DAYS))
-    access_token = Authorize.create_access_token(subject=user.username, expires_time=access_token_expires)
-    refresh_token = Authorize.create_refresh_token(subject=user.username, expires_time=access_token_expires)
-    return dto.Token(access_token=access_token, refresh_token=refresh_token)
+    return service.issue_tokens(Authorize, await service.get_by_username(user.username))
 
 
 @user_router.post(
@@ -101,6 +129,7 @@ async def register_user(
 async def register_user(
         request: requests.RegisterUser,
         _: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN]))],
+        service: UserServiceDep,
         Authorize: AuthJWT = Depends()
 ):
     user = await service.register(request, RoleEnum.ADMIN.name)
@@ -110,10 +139,7 @@ async def register_user(
             detail='Не удалось зарегистрироваться',
             headers={'WWW-Authenticate': 'Bearer'},
         )
-    access_token_expires = timedelta(days=int(ACCESS_TOKEN_EXPIRE_DAYS))
-    access_token = Authorize.create_access_token(subject=user.username, expires_time=access_token_expires)
-    refresh_token = Authorize.create_refresh_token(subject=user.username, expires_time=access_token_expires)
-    return dto.Token(access_token=access_token, refresh_token=refresh_token)
+    return service.issue_tokens(Authorize, await service.get_by_username(user.username))
 
 
 @user_router.get(
@@ -123,7 +149,8 @@ async def register_user(
     name='Получить мероприятия пользователя'
 )
 async def get_events_user(
-        user: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN, RoleEnum.USER]))]
+        user: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN, RoleEnum.USER]))],
+        event_member_service: EventMemberServiceDep,
 ):
     events = await event_member_service.get_all(user_id=user.id)
     if events is None:
@@ -145,14 +172,19 @@ async def get_events_user(
 )
 async def create_event_member(
         event_id: int,
-        user: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN, RoleEnum.USER]))]
-):
-    event_member = await event_member_service.create(event_id=event_id, user_id=user.id)
+        user: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN, RoleEnum.USER]))],
+        http_response: Response,
+        event_member_service: EventMemberServiceDep,
+) -> event_member_response.EventMemberEnrollResponse:
+    event_member, created = await event_member_service.create(event_id=event_id, user_id=user.id)
     if not event_member:
         raise event_member_errors.EventMemberHTTPError(
             status_code=status.HTTP_409_CONFLICT,
             detail='Не удалось записаться на мероприятие'
         )
+    if not created:
+        http_response.status_code = status.HTTP_200_OK
+    return event_member_response.EventMemberEnrollResponse.model_validate(event_member.model_dump())
 
 
 @user_router.delete(
@@ -163,7 +195,8 @@ async def create_event_member(
 )
 async def delete_event_member(
         event_id: int,
-        user: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN, RoleEnum.USER]))]
+        user: Annotated[UserView, Depends(Auth([RoleEnum.ADMIN, RoleEnum.USER]))],
+        event_member_service: EventMemberServiceDep,
 ):
     deleted_event_member = await event_member_service.delete(event_id=event_id, user_id=user.id)
     if not deleted_event_member:
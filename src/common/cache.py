@@ -0,0 +1,53 @@
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from cachetools import TTLCache
+
+
+class StatsCache:
+    """Bounded LRU cache with per-entry TTL that keeps hit/miss counters for the metrics endpoint."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        value = self._cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if value is not None:
+            self._cache[key] = value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drops one entry, or the whole cache when no key is given."""
+        self.invalidations += 1
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> None:
+        """Drops every entry whose value matches predicate; for lookups by something other than the key."""
+        self.invalidations += 1
+        for key, value in list(self._cache.items()):
+            if predicate(value):
+                self._cache.pop(key, None)
+
+    def statistics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": self._cache.currsize,
+            "maxsize": self._cache.maxsize,
+            "ttl": self._cache.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
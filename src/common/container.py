@@ -0,0 +1,62 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class Container:
+    """
+    App-lifetime registry of services and repositories.
+
+    Every key is built once, on first use, from its registered factory (the class itself by
+    default) and then shared. `provider(key)` gives a FastAPI dependency that resolves the key at
+    request time, so `override` swaps an implementation for routes, Auth and nested services alike.
+    """
+
+    def __init__(self) -> None:
+        self._factories: dict[type, Callable[[], Any]] = {}
+        self._instances: dict[type, Any] = {}
+        self._overrides: dict[type, Any] = {}
+        self._providers: dict[type, Callable[[], Any]] = {}
+
+    def register(self, key: type[T], factory: Callable[[], T]) -> None:
+        self._factories[key] = factory
+        self._instances.pop(key, None)
+
+    def resolve(self, key: type[T]) -> T:
+        if key in self._overrides:
+            return self._overrides[key]
+        instance = self._instances.get(key)
+        if instance is None:
+            instance = self._instances[key] = self._factories.get(key, key)()
+        return instance
+
+    def provider(self, key: type[T]) -> Callable[[], T]:
+        provider = self._providers.get(key)
+        if provider is None:
+            def provider() -> T:
+                return self.resolve(key)
+
+            provider.__name__ = f"provide_{key.__name__}"
+            self._providers[key] = provider
+        return provider
+
+    @contextmanager
+    def override(self, key: type[T], instance: T) -> Iterator[T]:
+        previous = self._overrides.get(key)
+        self._overrides[key] = instance
+        try:
+            yield instance
+        finally:
+            if previous is None:
+                self._overrides.pop(key, None)
+            else:
+                self._overrides[key] = previous
+
+    def reset(self) -> None:
+        """Drops built singletons, e.g. after the database engines were replaced."""
+        self._instances.clear()
+
+
+container = Container()
@@ -0,0 +1,145 @@
+import types
+import typing
+from typing import Any
+
+from pydantic import BaseModel as PydanticModel
+from sqlalchemy import inspect
+
+
+def _nested_view_model(annotation: Any) -> type[PydanticModel] | None:
+    """Finds the pydantic model inside annotations like `UserView | None` or `list[EventView]`."""
+    if isinstance(annotation, type) and issubclass(annotation, PydanticModel):
+        return annotation
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType, list):
+        for arg in typing.get_args(annotation):
+            view_model = _nested_view_model(arg)
+            if view_model is not None:
+                return view_model
+    return None
+
+
+class ReadPlan:
+    """
+    Field plan that copies loaded ORM attributes into a view model.
+
+    The plan is computed once per (ORM class, view model) pair from the mapper: plain columns
+    are read straight from the instance state and relationships are delegated to nested plans.
+    Attributes that are not loaded are skipped, so the view model defaults apply and no lazy
+    load is ever triggered.
+    """
+
+    def __init__(self, model_class: type, view_model: type[PydanticModel]) -> None:
+        self.model_class = model_class
+        self.view_model = view_model
+        self.fields: list[tuple[str, ReadPlan | None, bool]] = []
+
+    def compile(self) -> "ReadPlan":
+        mapper = inspect(self.model_class)
+        for name, field in self.view_model.model_fields.items():
+            if name in mapper.relationships:
+                relationship = mapper.relationships[name]
+                nested_view_model = _nested_view_model(field.annotation)
+                if nested_view_model is None:
+                    continue
+                plan = get_read_plan(relationship.mapper.class_, nested_view_model)
+                self.fields.append((name, plan, relationship.uselist))
+            elif name in mapper.column_attrs:
+                self.fields.append((name, None, False))
+        return self
+
+    def to_dict(self, model: Any) -> dict[str, Any]:
+        state = model.__dict__
+        data = {}
+        for name, plan, uselist in self.fields:
+            if name not in state:
+                continue
+            value = state[name]
+            if plan is not None and value is not None:
+                value = [plan.to_dict(item) for item in value] if uselist else plan.to_dict(value)
+            data[name] = value
+        return data
+
+    def __call__(self, model: Any) -> PydanticModel:
+        return self.view_model.model_validate(self.to_dict(model))
+
+
+_read_plans: dict[tuple[type, type[PydanticModel]], ReadPlan] = {}
+
+
+def get_read_plan(model_class: type, view_model: type[PydanticModel]) -> ReadPlan:
+    key = (model_class, view_model)
+    plan = _read_plans.get(key)
+    if plan is None:
+        # registered before compiling so that cyclic relationships resolve to the same plan
+        plan = _read_plans[key] = ReadPlan(model_class, view_model)
+        try:
+            plan.compile()
+        except Exception:
+            del _read_plans[key]
+            raise
+    return plan
+
+
+class WritePlan:
+    """
+    Assignment plan that copies DTO fields onto an ORM instance.
+
+    Computed once per (DTO class, ORM class) pair: the DTO fields that are mapped columns and
+    the relationships together with the ORM class to build for them. `dict` can be used as the
+    source for untyped input, in which case every mapped attribute is considered.
+    """
+
+    def __init__(self, source: type, model_class: type) -> None:
+        mapper = inspect(model_class)
+        names = mapper.attrs.keys() if source is dict else source.model_fields.keys()
+        self.model_class = model_class
+        self.columns = [name for name in names if name in mapper.column_attrs]
+        self.relationships = [
+            (name, mapper.relationships[name].mapper.class_, mapper.relationships[name].uselist)
+            for name in names if name in mapper.relationships
+        ]
+
+    def apply(self, data: dict[str, Any], model: Any) -> Any:
+        for name in self.columns:
+            if name in data:
+                setattr(model, name, data[name])
+        for name, class_, uselist in self.relationships:
+            if name not in data:
+                continue
+            value = data[name]
+            if uselist:
+                values = value if isinstance(value, list) else [value]
+                setattr(model, name, [build_model(item, class_) for item in values])
+            else:
+                setattr(model, name, build_model(value, class_))
+        return model
+
+    def to_row(self, obj: PydanticModel) -> dict[str, Any]:
+        """Column values of one DTO, suitable as a parameter set for a multi-row INSERT."""
+        data = obj.model_dump()
+        return {name: data[name] for name in self.columns if name in data}
+
+
+_write_plans: dict[tuple[type, type], WritePlan] = {}
+
+
+def get_write_plan(source: type, model_class: type) -> WritePlan:
+    key = (source, model_class)
+    plan = _write_plans.get(key)
+    if plan is None:
+        plan = _write_plans[key] = WritePlan(source, model_class)
+    return plan
+
+
+def write_model(obj_in: PydanticModel | dict, model: Any) -> Any:
+    """Assigns the set fields of obj_in onto an ORM instance using the cached write plan."""
+    if isinstance(obj_in, PydanticModel):
+        plan = get_write_plan(type(obj_in), type(model))
+        obj_in = obj_in.model_dump(exclude_unset=True)
+    else:
+        plan = get_write_plan(dict, type(model))
+    return plan.apply(obj_in, model)
+
+
+def build_model(obj_in: PydanticModel | dict, model_class: type) -> Any:
+    return write_model(obj_in, model_class())
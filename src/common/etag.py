@@ -0,0 +1,19 @@
+import hashlib
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag built from a data version stamp and whatever identifies the resource."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so a W/ prefix sent back by a proxy still matches."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(
+        candidate.strip().removeprefix('W/') == etag
+        for candidate in if_none_match.split(',')
+    )
@@ -11,6 +11,9 @@ class AuthConfig:
     _secret_key = None
     _public_key = None
     _private_key = None
+    _key_id = None
+    _public_keys = None
+    _prepared_keys = {}
     _algorithm = "HS256"
     _decode_algorithms = None
     _decode_leeway = 0
@@ -45,6 +48,10 @@ class AuthConfig:
     _refresh_csrf_header_name = "X-CSRF-Token"
     _csrf_methods = {'POST', 'PUT', 'PATCH', 'DELETE'}
 
+    # option for caching verified tokens
+    _token_cache_maxsize = 1024
+    _token_cache = None
+
     @property
     def jwt_in_cookies(self) -> bool:
         return 'cookies' in self._token_location
@@ -62,6 +69,9 @@ class AuthConfig:
             cls._secret_key = config.authjwt_secret_key
             cls._public_key = config.authjwt_public_key
             cls._private_key = config.authjwt_private_key
+            cls._key_id = config.authjwt_key_id
+            cls._public_keys = config.authjwt_public_keys
+            cls._prepared_keys = {}
             cls._algorithm = config.authjwt_algorithm
             cls._decode_algorithms = config.authjwt_decode_algorithms
             cls._decode_leeway = config.authjwt_decode_leeway
@@ -92,6 +102,9 @@ class AuthConfig:
             cls._access_csrf_header_name = config.authjwt_access_csrf_header_name
             cls._refresh_csrf_header_name = config.authjwt_refresh_csrf_header_name
             cls._csrf_methods = config.authjwt_csrf_methods
+            # option for caching verified tokens, rebuilt on first use with the new keys
+            cls._token_cache_maxsize = config.authjwt_token_cache_maxsize
+            cls._token_cache = None
         except ValidationError:
             raise
         except Exception:
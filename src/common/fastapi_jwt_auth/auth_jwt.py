@@ -1,5 +1,6 @@
-import jwt, re, uuid, hmac
-from jwt.algorithms import requires_cryptography, has_crypto
+import jwt, re, uuid, hmac, hashlib, threading, time
+from cachetools import TLRUCache
+from jwt.algorithms import requires_cryptography, has_crypto, get_default_algorithms
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Union, Sequence
 from fastapi import Request, Response, WebSocket
@@ -15,6 +16,8 @@ from .exceptions import (
     FreshTokenRequired
 )
 
+_algorithms = get_default_algorithms()
+
 
 class AuthJWT(AuthConfig):
     def __init__(self, req: Request = None, res: Response = None):
@@ -61,6 +64,33 @@ class AuthJWT(AuthConfig):
                 raise InvalidHeaderError(status_code=422, message=msg)
             self._token = parts[1]
 
+    @classmethod
+    def _get_token_cache(cls) -> Optional["_VerifiedTokenCache"]:
+        """
+        Cache of verified claims shared by every AuthJWT instance, built lazily from the loaded config
+        """
+        if not cls._token_cache_maxsize:
+            return None
+        if cls._token_cache is None:
+            leeway = cls._decode_leeway
+            if isinstance(leeway, timedelta):
+                leeway = leeway.total_seconds()
+            cls._token_cache = _VerifiedTokenCache(cls._token_cache_maxsize, leeway)
+        return cls._token_cache
+
+    @classmethod
+    def evict_token(cls, encoded_token: str) -> None:
+        """
+        Drop a token from the verified token cache, e.g. after it has been revoked
+        """
+        if cls._token_cache is not None:
+            cls._token_cache.evict(encoded_token)
+
+    @classmethod
+    def token_cache_statistics(cls) -> dict:
+        cache = cls._get_token_cache()
+        return cache.statistics() if cache is not None else {"enabled": False}
+
     def _get_jwt_identifier(self) -> str:
         return str(uuid.uuid4())
 
@@ -74,12 +104,40 @@ class AuthJWT(AuthConfig):
             raise TypeError('a datetime is required')
         return int(value.timestamp())
 
-    def _get_secret_key(self, algorithm: str, process: str) -> str:
+    def _get_secret_key(self, algorithm: str, process: str, key_id: Optional[str] = None):
+        """
+        Get key with a different algorithm, parsed once per algorithm and key id
+
+        :param algorithm: algorithm for decode and encode token
+        :param process: for indicating get key for encode or decode token
+        :param key_id: kid header of the token being decoded, selects the key from authjwt_public_keys
+
+        :return: key object ready for the algorithm, so PyJWT does not parse the PEM again
+        """
+        if algorithm not in _algorithms:
+            raise ValueError("Algorithm {} could not be found".format(algorithm))
+
+        # the kid comes from an unverified header: only kids of older public keys get their own
+        # entry, and _get_raw_secret_key rejects unknown ones before anything is cached
+        if process != "decode" or algorithm not in requires_cryptography or key_id == self._key_id:
+            key_id = None
+        elif key_id is not None and not isinstance(key_id, str):
+            raise JWTDecodeError(status_code=422, message="Invalid key id")
+
+        cache_key = (algorithm, process, key_id)
+        key = self._prepared_keys.get(cache_key)
+        if key is None:
+            key = _algorithms[algorithm].prepare_key(self._get_raw_secret_key(algorithm, process, key_id))
+            self._prepared_keys[cache_key] = key
+        return key
+
+    def _get_raw_secret_key(self, algorithm: str, process: str, key_id: Optional[str] = None) -> str:
         """
-        Get key with a different algorithm
+        Get key material with a different algorithm
 
         :param algorithm: algorithm for decode and encode token
         :param process: for indicating get key for encode or decode token
+        :param key_id: kid header of the token being decoded
 
         :return: plain text or RSA depends on algorithm
         """
@@ -110,6 +168,12 @@ class AuthJWT(AuthConfig):
             return self._private_key
 
         if process == "decode":
+            # during rotation tokens signed by older keys name them in the kid header
+            if key_id is not None and key_id != self._key_id:
+                if not self._public_keys or key_id not in self._public_keys:
+                    raise JWTDecodeError(status_code=422, message="Unknown key id {}".format(key_id))
+                return self._public_keys[key_id]
+
             if not self._public_key:
                 raise RuntimeError(
                     "authjwt_public_key must be set when using asymmetric algorithm {}".format(algorithm)
@@ -187,6 +251,9 @@ class AuthJWT(AuthConfig):
         except Exception:
             raise
 
+        if self._key_id:
+            headers = {"kid": self._key_id, **(headers or {})}
+
         return jwt.encode(
             {**reserved_claims, **custom_claims, **user_claims},
             secret_key,
@@ -580,9 +647,7 @@ class AuthJWT(AuthConfig):
 
         :param token: The encoded JWT
         """
-        if token: self._verifying_token(token)
-
-        if token and self.get_raw_jwt(token)['type'] != 'access':
+        if token and self._verifying_token(token)['type'] != 'access':
             raise AccessTokenRequired(status_code=422, message="Only access tokens are allowed")
 
     def _verify_jwt_in_request(
@@ -591,7 +656,7 @@ class AuthJWT(AuthConfig):
             type_token: str,
             token_from: str,
             fresh: Optional[bool] = False
-    ) -> None:
+    ) -> Dict[str, Union[str, int, bool]]:
         """
         Ensure that the requester has a valid token. this also check the freshness of the access token
 
@@ -599,6 +664,8 @@ class AuthJWT(AuthConfig):
         :param type_token: indicate token is access or refresh token
         :param token_from: indicate token from headers cookies, websocket
         :param fresh: check freshness token if True
+
+        :return: claims of the verified JWT
         """
         if type_token not in ['access', 'refresh']:
             raise ValueError("type_token must be between 'access' or 'refresh'")
@@ -614,28 +681,33 @@ class AuthJWT(AuthConfig):
 
         # verify jwt
         issuer = self._decode_issuer if type_token == 'access' else None
-        self._verifying_token(token, issuer)
+        raw_token = self._verifying_token(token, issuer)
 
-        if self.get_raw_jwt(token)['type'] != type_token:
+        if raw_token['type'] != type_token:
             msg = "Only {} tokens are allowed".format(type_token)
             if type_token == 'access':
                 raise AccessTokenRequired(status_code=422, message=msg)
             if type_token == 'refresh':
                 raise RefreshTokenRequired(status_code=422, message=msg)
 
-        if fresh and not self.get_raw_jwt(token)['fresh']:
+        if fresh and not raw_token['fresh']:
             raise FreshTokenRequired(status_code=401, message="Fresh token required")
 
-    def _verifying_token(self, encoded_token: str, issuer: Optional[str] = None) -> None:
+        return raw_token
+
+    def _verifying_token(self, encoded_token: str, issuer: Optional[str] = None) -> Dict[str, Union[str, int, bool]]:
         """
         Verified token and check if token is revoked
 
         :param encoded_token: token hash
         :param issuer: expected issuer in the JWT
+
+        :return: claims of the verified JWT
         """
         raw_token = self._verified_token(encoded_token, issuer)
         if raw_token['type'] in self._denylist_token_checks:
             self._check_token_is_revoked(raw_token)
+        return raw_token
 
     def _verified_token(self, encoded_token: str, issuer: Optional[str] = None) -> Dict[str, Union[str, int, bool]]:
         """
@@ -646,6 +718,12 @@ class AuthJWT(AuthConfig):
 
         :return: raw data from the hash token in the form of a dictionary
         """
+        cache = self._get_token_cache()
+        if cache is not None:
+            claims = cache.get(encoded_token, issuer)
+            if claims is not None:
+                return claims
+
         algorithms = self._decode_algorithms or [self._algorithm]
 
         try:
@@ -653,13 +731,15 @@ class AuthJWT(AuthConfig):
         except Exception as err:
             raise InvalidHeaderError(status_code=422, message=str(err))
 
-        try:
-            secret_key = self._get_secret_key(unverified_headers['alg'], "decode")
-        except Exception:
-            raise
+        # reject alg "none" and anything not allowed before a key is looked up for it
+        algorithm = unverified_headers.get('alg')
+        if algorithm not in algorithms:
+            raise JWTDecodeError(status_code=422, message="The specified alg value is not allowed")
+
+        secret_key = self._get_secret_key(algorithm, "decode", unverified_headers.get('kid'))
 
         try:
-            return jwt.decode(
+            claims = jwt.decode(
                 encoded_token,
                 secret_key,
                 issuer=issuer,
@@ -670,6 +750,10 @@ class AuthJWT(AuthConfig):
         except Exception as err:
             raise JWTDecodeError(status_code=422, message=str(err))
 
+        if cache is not None:
+            cache.set(encoded_token, issuer, claims)
+        return claims
+
     def jwt_required(
             self,
             auth_from: str = "request",
@@ -812,6 +896,16 @@ class AuthJWT(AuthConfig):
                 if self.jwt_in_cookies:
                     self._verify_and_get_jwt_in_cookies('access', self._request, fresh=True)
 
+    def verify_access_token(self, encoded_token: str) -> Dict[str, Union[str, int, bool]]:
+        """
+        Verify an access token passed explicitly (e.g. resolved by an OAuth2 security scheme)
+        and return its claims. Raise the same errors as jwt_required()
+
+        :param encoded_token: The encoded JWT
+        :return: claims of JWT
+        """
+        return self._verify_jwt_in_request(encoded_token, 'access', 'headers')
+
     def get_raw_jwt(self, encoded_token: Optional[str] = None) -> Optional[Dict[str, Union[str, int, bool]]]:
         """
         this will return the python dictionary which has all of the claims of the JWT that is accessing the endpoint.
@@ -856,3 +950,57 @@ class AuthJWT(AuthConfig):
         encoded_token = encoded_token or self._token
 
         return jwt.get_unverified_header(encoded_token)
+
+
+class _VerifiedTokenCache:
+    """
+    Bounded LRU of verified claims keyed by the token digest and the expected issuer.
+    An entry lives until the token's exp (plus leeway), after which jwt.decode would reject it anyway.
+    The denylist is still consulted on every hit by _verifying_token.
+    """
+
+    def __init__(self, maxsize: int, leeway: float):
+        self._leeway = leeway
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._ttu, timer=time.time)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _ttu(self, _key, claims: dict, now: float) -> float:
+        exp = claims.get('exp')
+        return float('inf') if exp is None else exp + self._leeway
+
+    @staticmethod
+    def _digest(encoded_token: str) -> bytes:
+        return hashlib.sha256(encoded_token.encode('utf-8')).digest()
+
+    def get(self, encoded_token: str, issuer: Optional[str]) -> Optional[dict]:
+        with self._lock:
+            claims = self._cache.get((self._digest(encoded_token), issuer))
+            if claims is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # callers may mutate the claims they get back
+        return dict(claims)
+
+    def set(self, encoded_token: str, issuer: Optional[str], claims: dict) -> None:
+        with self._lock:
+            self._cache[(self._digest(encoded_token), issuer)] = dict(claims)
+
+    def evict(self, encoded_token: str) -> None:
+        digest = self._digest(encoded_token)
+        with self._lock:
+            for key in [key for key in self._cache.keys() if key[0] == digest]:
+                self._cache.pop(key, None)
+
+    def statistics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._cache.currsize,
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
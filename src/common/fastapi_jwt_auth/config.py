@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Optional, Union, Sequence, List
+from typing import Optional, Union, Sequence, List, Dict
 from pydantic import (
     BaseModel,
     validator,
@@ -14,6 +14,8 @@ class LoadConfig(BaseModel):
     authjwt_secret_key: Optional[StrictStr] = None
     authjwt_public_key: Optional[StrictStr] = None
     authjwt_private_key: Optional[StrictStr] = None
+    authjwt_key_id: Optional[StrictStr] = None
+    authjwt_public_keys: Optional[Dict[StrictStr, StrictStr]] = None
     authjwt_algorithm: Optional[StrictStr] = "HS256"
     authjwt_decode_algorithms: Optional[List[StrictStr]] = None
     authjwt_decode_leeway: Optional[Union[StrictInt, timedelta]] = 0
@@ -44,6 +46,8 @@ class LoadConfig(BaseModel):
     authjwt_access_csrf_header_name: Optional[StrictStr] = "X-CSRF-Token"
     authjwt_refresh_csrf_header_name: Optional[StrictStr] = "X-CSRF-Token"
     authjwt_csrf_methods: Optional[List[StrictStr]] = ['POST', 'PUT', 'PATCH', 'DELETE']
+    # # option for caching verified tokens, 0 disables the cache
+    authjwt_token_cache_maxsize: Optional[StrictInt] = 1024
 
     @validator('authjwt_access_token_expires')
     def validate_access_token_expires(cls, v):
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from passlib.context import CryptContext
+
+
+class PasswordHasher:
+    """
+    Runs passlib hashing and verification on a dedicated thread pool.
+
+    pbkdf2 spends its time inside hashlib, which releases the GIL, so threads are enough to keep
+    the event loop free. max_workers caps how many hashes run at once; further calls wait in the
+    executor queue, whose depth is reported by statistics().
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int) -> None:
+        self.context = context
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hash')
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    async def hash(self, secret: str) -> str:
+        return await self._run(self.context.hash, secret)
+
+    async def verify(self, secret: str, hashed: str | bytes) -> bool:
+        return await self._run(self.context.verify, secret, hashed)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.total_wait_time += started - submitted
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.total_run_time += time.perf_counter() - started
+
+        with self._lock:
+            self.pending += 1
+            self.max_queued = max(self.max_queued, self.pending - self.running)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def statistics(self) -> dict:
+        with self._lock:
+            completed = self.completed
+            return {
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "max_queued": self.max_queued,
+                "completed": completed,
+                "avg_wait_ms": round(self.total_wait_time / completed * 1000, 3) if completed else 0.0,
+                "avg_run_ms": round(self.total_run_time / completed * 1000, 3) if completed else 0.0,
+            }
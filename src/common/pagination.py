@@ -0,0 +1,19 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(started_at: datetime, item_id: int) -> str:
+    """Encodes the (started_at, id) keyset position into an opaque url-safe cursor."""
+    raw = json.dumps([started_at.isoformat(), item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decodes a cursor produced by encode_cursor, raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        started_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(started_at), int(item_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -1,16 +1,27 @@
 from src.db.engine import DatabaseEngine
+from src.db.registry import PRIMARY, TEST, engine_registry
 from src.settings import (
+    DEBUG,
     DatabaseSettings,
     get_settings,
 )
 
-db_engine = DatabaseEngine(
-    db_url=str(get_settings(DatabaseSettings).url),
-    debug=False
-)
+_settings = get_settings(DatabaseSettings)
 
-test_db_engine = DatabaseEngine(
+engine_registry.register(PRIMARY, lambda: DatabaseEngine(
+    db_url=str(_settings.url),
+    debug=False,
+    replica_urls=[str(url) for url in _settings.replica_urls]
+))
+engine_registry.register(TEST, lambda: DatabaseEngine(
     db_url="sqlite+aiosqlite:///test.db",
     debug=False,
-    create_db=True
-)
+    create_db=True,
+    pooled=False
+))
+# without an explicit choice an unset DEBUG still means the local SQLite engine
+engine_registry.default = _settings.default_engine or (TEST if DEBUG is False else PRIMARY)
+
+
+def get_db_engine() -> DatabaseEngine:
+    return engine_registry.get()
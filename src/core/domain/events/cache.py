@@ -0,0 +1,6 @@
+from src.common.cache import StatsCache
+from src.settings import CacheSettings, get_settings
+
+_settings = get_settings(CacheSettings)
+
+events_cache = StatsCache(maxsize=_settings.events_maxsize, ttl=_settings.events_ttl)
@@ -1,9 +1,14 @@
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel
 
 from src.common.base_dto import PydanticBaseModel
 
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 200
+BULK_CREATE_MAX = 5000
+
 
 class Event(PydanticBaseModel):
     name: str
@@ -15,7 +20,26 @@ class EventView(Event):
     ...
 
 
+class EventExportRow(PydanticBaseModel):
+    """Event as stored: the export also covers rows whose columns were never filled."""
+    name: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
 class EventCreate(BaseModel):
     name: str
     started_at: datetime
     finished_at: datetime
+
+
+class EventPageQuery(BaseModel):
+    limit: int = PAGE_SIZE_DEFAULT
+    started_from: datetime | None = None
+    finished_to: datetime | None = None
+    after: tuple[datetime, int] | None = None
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
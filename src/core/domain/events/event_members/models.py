@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, ForeignKey
+from sqlalchemy import Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.common.mixins.models import PrimaryKeyMixin
@@ -9,6 +9,11 @@ from src.db.engine import Base
 
 class EventMembers(Base, PrimaryKeyMixin):
     __tablename__ = 'event_members'
+    __table_args__ = (
+        Index('ux_event_members_event_id_user_id', 'event_id', 'user_id', unique=True),
+        Index('ix_event_members_user_id_event_id', 'user_id', 'event_id'),
+    )
+
     event_id: Mapped[int] = mapped_column(Integer, ForeignKey('events.id'))
     event = relationship(
         Event,
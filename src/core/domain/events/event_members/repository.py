@@ -1,11 +1,16 @@
 from loguru import logger
-from sqlalchemy import select, delete
-from sqlalchemy.exc import DatabaseError
+from sqlalchemy import select, delete, lambda_stmt
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DatabaseError, IntegrityError
 from sqlalchemy.orm import joinedload
 
 from src.common.base import BaseRepository
 from src.core.domain.events.event_members import dto
 from src.core.domain.events.event_members.models import EventMembers
+from src.core.domain.events.repository import EventRepository
+from src.core.domain.users.models import User
+
+MEMBERS_BATCH_SIZE = 1000
 
 
 class EventMemberRepository(BaseRepository):
@@ -26,83 +31,110 @@ class EventMemberRepository(BaseRepository):
         )
         return stmt
 
-    async def create(self, data: dto.EventMemberCreate):
+    async def create(self, data: dto.EventMemberCreate) -> tuple[dto.EventMember | None, bool]:
+        """Enrolls idempotently: returns the enrollment and whether it was created by this call."""
         async with self.session() as session:
-            async with session.begin():
-                model = self._pydantic_to_model(data, self.database_model())
-                session.add(model)
-                await session.commit()
-            await session.refresh(model)
-            return model
+            insert = postgresql.insert if session.bind.dialect.name == 'postgresql' else sqlite.insert
+            stmt = (
+                insert(self.database_model)
+                .values(**data.model_dump())
+                .on_conflict_do_nothing(index_elements=['event_id', 'user_id'])
+                .returning(self.database_model.id)
+            )
+            try:
+                member_id = (await session.execute(stmt)).scalar_one_or_none()
+                created = member_id is not None
+                if created:
+                    await EventRepository.bump_version(self.db)
+                else:
+                    member_id = (await session.execute(
+                        select(self.database_model.id)
+                        .where(self.database_model.event_id == data.event_id)
+                        .where(self.database_model.user_id == data.user_id)
+                    )).scalar_one()
+            except IntegrityError as e:
+                logger.info(f'Ошибка при записи на мероприятие: {e}')
+                return None, False
+            return dto.EventMember(id=member_id, **data.model_dump()), created
 
     async def get_all(self, user_id: int) -> list[dto.EventMemberView]:
-        async with self.session() as session:
-            async with session.begin():
+        async with self.session(read_only=True) as session:
+            stmt = (
+                self.base_stmt
+                .where(self.database_model.user_id == user_id)
+            )
+            items = (await session.scalars(stmt)).unique().all()
+        if items:
+            return [self._model_to_pydantic(item, self.view_model) for item in items]
+
+    async def get_by_event_id(self, event_id: int, user_id: int) -> dto.EventMemberView:
+        stmt = lambda_stmt(
+            lambda: select(EventMembers)
+            .options(joinedload(EventMembers.user), joinedload(EventMembers.event))
+            .where(EventMembers.event_id == event_id)
+            .where(EventMembers.user_id == user_id)
+        )
+        async with self.session(read_only=True) as session:
+            item = (await session.scalars(stmt)).unique().first()
+        if item:
+            return self._model_to_pydantic(item, self.view_model)
+
+    async def get_events_by_event_id(self, event_id: int) -> list[dto.EventMemberView]:
+        async with self.session(read_only=True) as session:
+            stmt = (
+                self.base_stmt
+                .where(self.database_model.event_id == event_id)
+            )
+            items = (await session.scalars(stmt)).unique().all()
+        if items:
+            return [self._model_to_pydantic(item, self.view_model) for item in items]
+        return []
+
+    async def get_member_names_by_event_ids(self, event_ids: list[int]) -> dict[int, list[str]]:
+        members = {event_id: [] for event_id in event_ids}
+        if not event_ids:
+            return members
+        async with self.session(read_only=True) as session:
+            for offset in range(0, len(event_ids), MEMBERS_BATCH_SIZE):
                 stmt = (
-                    self.base_stmt
-                    .where(self.database_model.user_id == user_id)
+                    select(self.database_model.event_id, User.first_name)
+                    .join(User, User.id == self.database_model.user_id)
+                    .where(self.database_model.event_id.in_(event_ids[offset:offset + MEMBERS_BATCH_SIZE]))
+                    .order_by(self.database_model.event_id, self.database_model.id)
                 )
-                items = (await session.scalars(stmt)).unique().all()
-                if items:
-                    return [self._model_to_pydantic(item, self.view_model) for item in items]
+                for event_id, first_name in await session.execute(stmt):
+                    members[event_id].append(first_name)
+        return members
 
-    async def get_by_event_id(self, event_id: int, user_id: int) -> dto.EventMemberView:
+    async def delete(self, event_id: int, user_id: int) -> bool:
         async with self.session() as session:
-            async with session.begin():
+            try:
                 stmt = (
-                    self.base_stmt
+                    delete(self.database_model)
                     .where(self.database_model.event_id == event_id)
                     .where(self.database_model.user_id == user_id)
+                    .returning(self.database_model)
                 )
-                item = (await session.scalars(stmt)).unique().first()
-                if item:
-                    return self._model_to_pydantic(item, self.view_model)
+                await session.scalars(stmt)
+                await EventRepository.bump_version(self.db)
+                logger.info('Запись на Мероприятие удалено')
+                return True
+            except DatabaseError as e:
+                logger.info(f'Ошибка при удалении Записи на мероприятие: {e}')
+                return False
 
-    async def get_events_by_event_id(self, event_id: int) -> list[dto.EventMemberView]:
+    async def delete_by_event_id(self, event_id: int) -> bool:
         async with self.session() as session:
-            async with session.begin():
+            try:
                 stmt = (
-                    self.base_stmt
+                    delete(self.database_model)
                     .where(self.database_model.event_id == event_id)
+                    .returning(self.database_model)
                 )
-                items = (await session.scalars(stmt)).unique().all()
-                if items:
-                    return [self._model_to_pydantic(item, self.view_model) for item in items]
-                return []
-
-    async def delete(self, event_id: int, user_id: int) -> bool:
-        async with self.session() as session:
-            async with session.begin():
-                try:
-                    stmt = (
-                        delete(self.database_model)
-                        .where(self.database_model.event_id == event_id)
-                        .where(self.database_model.user_id == user_id)
-                        .returning(self.database_model)
-                    )
-                    await session.scalars(stmt)
-                    await session.commit()
-                    logger.info('Запись на Мероприятие удалено')
-                    return True
-                except DatabaseError as e:
-                    await session.rollback()
-                    logger.info(f'Ошибка при удалении Записи на мероприятие: {e}')
-                    return False
-
-    async def delete_by_event_id(self, event_id: int) -> bool:
-        async with self.session() as session:
-            async with session.begin():
-                try:
-                    stmt = (
-                        delete(self.database_model)
-                        .where(self.database_model.event_id == event_id)
-                        .returning(self.database_model)
-                    )
-                    await session.scalars(stmt)
-                    await session.commit()
-                    logger.info('Запись на Мероприятие удалено')
-                    return True
-                except DatabaseError as e:
-                    await session.rollback()
-                    logger.info(f'Ошибка при удалении Записи на мероприятие: {e}')
-                    return False
+                await session.scalars(stmt)
+                await EventRepository.bump_version(self.db)
+                logger.info('Запись на Мероприятие удалено')
+                return True
+            except DatabaseError as e:
+                logger.info(f'Ошибка при удалении Записи на мероприятие: {e}')
+                return False
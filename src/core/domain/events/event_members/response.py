@@ -8,3 +8,9 @@ class EventMemberResponse(BaseModel):
 
 class EventMemberListResponse(BaseModel):
     name: str
+
+
+class EventMemberEnrollResponse(BaseModel):
+    id: int
+    event_id: int
+    user_id: int
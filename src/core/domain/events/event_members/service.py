@@ -1,20 +1,24 @@
+from src.common.container import container
+from src.core.domain.events.cache import events_cache
 from src.core.domain.events.event_members import requests, dto
 from src.core.domain.events.event_members.repository import EventMemberRepository
 
 
 class EventMemberService:
-    def __init__(
-            self
-    ) -> None:
-        self._repository = EventMemberRepository()
+    @property
+    def _repository(self) -> EventMemberRepository:
+        return container.resolve(EventMemberRepository)
 
-    async def create(self, event_id: int, user_id: int) -> dto.EventView:
+    async def create(self, event_id: int, user_id: int) -> tuple[dto.EventMember | None, bool]:
         request_data = {
             "event_id": event_id,
             "user_id": user_id
         }
         create_data = dto.EventMemberCreate.model_validate(request_data)
-        return await self._repository.create(create_data)
+        event_member, created = await self._repository.create(create_data)
+        if created:
+            self._repository.db.after_commit(events_cache.invalidate)
+        return event_member, created
 
     async def get_all(
             self,
@@ -28,5 +32,10 @@ class EventMemberService:
     async def get_members_by_event_id(self, event_id: int) -> list[dto.EventMemberView]:
         return await self._repository.get_events_by_event_id(event_id=event_id)
 
+    async def get_member_names_by_event_ids(self, event_ids: list[int]) -> dict[int, list[str]]:
+        return await self._repository.get_member_names_by_event_ids(event_ids=event_ids)
+
     async def delete(self, event_id: int, user_id: int):
-        return await self._repository.delete(event_id=event_id, user_id=user_id)
+        deleted = await self._repository.delete(event_id=event_id, user_id=user_id)
+        self._repository.db.after_commit(events_cache.invalidate)
+        return deleted
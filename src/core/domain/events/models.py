@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import BigInteger, Column, String, DateTime, Index
 
 from src.common.mixins.models import PrimaryKeyMixin
 from src.db.engine import Base
@@ -6,6 +6,18 @@ from src.db.engine import Base
 
 class Event(Base, PrimaryKeyMixin):
     __tablename__ = 'events'
+    __table_args__ = (
+        Index('ix_events_started_at_id', 'started_at', 'id'),
+    )
+
     name = Column(String)
     started_at = Column(DateTime)
     finished_at = Column(DateTime)
+
+
+class DataVersion(Base):
+    """Counter bumped in the same transaction as every write to a scope, used for ETags."""
+    __tablename__ = 'data_versions'
+
+    scope = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
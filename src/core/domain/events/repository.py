@@ -1,11 +1,22 @@
+from collections.abc import AsyncIterator
+
 from loguru import logger
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, lambda_stmt, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import DatabaseError
 from sqlalchemy.orm import joinedload
 
 from src.common.base import BaseRepository
+from src.common.converters import get_write_plan
 from src.core.domain.events import dto
-from src.core.domain.events.models import Event
+from src.core.domain.events.event_members.models import EventMembers
+from src.core.domain.events.models import DataVersion, Event
+from src.core.domain.users.models import User
+from src.db.engine import DatabaseEngine
+
+EXPORT_BATCH_SIZE = 500
+# data_versions scope covering events and their members
+VERSION_SCOPE = 'events'
 
 
 class EventRepository(BaseRepository):
@@ -22,50 +33,138 @@ class EventRepository(BaseRepository):
         )
         return stmt
 
+    @staticmethod
+    async def bump_version(db: DatabaseEngine) -> None:
+        """
+        Increments the events version once the caller's unit of work commits, in a transaction of
+        its own: concurrent writers do not queue on the counter row for their whole transaction.
+        """
+        await db.after_commit_async(lambda: EventRepository._increment_version(db))
+
+    @staticmethod
+    async def _increment_version(db: DatabaseEngine) -> None:
+        async with db.session() as session:
+            insert_ = postgresql.insert if session.bind.dialect.name == 'postgresql' else sqlite.insert
+            stmt = insert_(DataVersion).values(scope=VERSION_SCOPE, version=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['scope'],
+                set_={'version': DataVersion.version + 1}
+            )
+            try:
+                await session.execute(stmt)
+            except DatabaseError as e:
+                logger.info(f'Ошибка при обновлении версии мероприятий: {e}')
+
     async def create(self, data: dto.EventCreate):
         async with self.session() as session:
-            async with session.begin():
-                model = self._pydantic_to_model(data, self.database_model())
-                session.add(model)
-                await session.commit()
-            await session.refresh(model)
+            model = self._pydantic_to_model(data, self.database_model())
+            session.add(model)
+            await session.flush()
+            await self.bump_version(self.db)
             return model
 
-    async def get_all(self) -> list[dto.EventView]:
+    async def create_many(self, data: list[dto.EventCreate]) -> list[int]:
+        if not data:
+            return []
+        stmt = (
+            insert(self.database_model)
+            .returning(self.database_model.id, sort_by_parameter_order=True)
+        )
         async with self.session() as session:
-            async with session.begin():
-                stmt = (
-                    self.base_stmt
-                )
-                items = (await session.scalars(stmt)).unique().all()
-                if items:
-                    return [self._model_to_pydantic(item, self.view_model) for item in items]
+            plan = get_write_plan(dto.EventCreate, self.database_model)
+            ids = (await session.scalars(stmt, [plan.to_row(item) for item in data])).all()
+            await self.bump_version(self.db)
+            return list(ids)
+
+    async def get_all(self) -> list[dto.EventView]:
+        async with self.session(read_only=True) as session:
+            stmt = (
+                self.base_stmt
+            )
+            items = (await session.scalars(stmt)).unique().all()
+        if items:
+            return [self._model_to_pydantic(item, self.view_model) for item in items]
+
+    async def get_stamp(self) -> int:
+        """
+        Version of events, event_members and the member names: a primary-key lookup of the counter
+        that every write to these tables bumps right after it commits.
+        """
+        stmt = select(DataVersion.version).where(DataVersion.scope == VERSION_SCOPE)
+        async with self.session(read_only=True) as session:
+            version = (await session.execute(stmt)).scalar_one_or_none()
+        return version or 0
+
+    async def get_page(self, query: dto.EventPageQuery) -> list[dto.EventView]:
+        # started_at is nullable but is the keyset: NULL rows cannot be placed on a page or cursor
+        stmt = (
+            self.base_stmt
+            .where(self.database_model.started_at.is_not(None))
+            .order_by(self.database_model.started_at, self.database_model.id)
+            .limit(query.limit + 1)
+        )
+        if query.started_from is not None:
+            stmt = stmt.where(self.database_model.started_at >= query.started_from)
+        if query.finished_to is not None:
+            stmt = stmt.where(self.database_model.finished_at <= query.finished_to)
+        if query.after is not None:
+            stmt = stmt.where(tuple_(self.database_model.started_at, self.database_model.id) > tuple_(*query.after))
+        async with self.session(read_only=True) as session:
+            items = (await session.scalars(stmt)).all()
+        return [self._model_to_pydantic(item, self.view_model) for item in items]
+
+    async def stream_with_members(self) -> AsyncIterator[tuple[dto.EventExportRow, list[str]]]:
+        stmt = (
+            select(
+                self.database_model.id,
+                self.database_model.name,
+                self.database_model.started_at,
+                self.database_model.finished_at,
+                User.first_name
+            )
+            .outerjoin(EventMembers, EventMembers.event_id == self.database_model.id)
+            .outerjoin(User, User.id == EventMembers.user_id)
+            .order_by(self.database_model.id, EventMembers.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async with self.session(read_only=True, stream=True) as session:
+            result = await session.stream(stmt)
+            event, members = None, []
+            async for row in result:
+                if event is None or event.id != row.id:
+                    if event is not None:
+                        yield event, members
+                    event = dto.EventExportRow(
+                        id=row.id,
+                        name=row.name,
+                        started_at=row.started_at,
+                        finished_at=row.finished_at
+                    )
+                    members = []
+                if row.first_name is not None:
+                    members.append(row.first_name)
+            if event is not None:
+                yield event, members
 
     async def get_by_id(self, event_id: int) -> dto.EventView:
+        stmt = lambda_stmt(lambda: select(Event).where(Event.id == event_id))
+        async with self.session(read_only=True) as session:
+            item = (await session.scalars(stmt)).unique().first()
+        if item:
+            return self._model_to_pydantic(item, self.view_model)
+
+    async def delete(self, event_id: int) -> bool:
         async with self.session() as session:
-            async with session.begin():
+            try:
                 stmt = (
-                    self.base_stmt
+                    delete(self.database_model)
                     .where(self.database_model.id == event_id)
+                    .returning(self.database_model)
                 )
-                item = (await session.scalars(stmt)).unique().first()
-                if item:
-                    return self._model_to_pydantic(item, self.view_model)
-
-    async def delete(self, event_id: int) -> bool:
-        async with self.session() as session:
-            async with session.begin():
-                try:
-                    stmt = (
-                        delete(self.database_model)
-                        .where(self.database_model.id == event_id)
-                        .returning(self.database_model)
-                    )
-                    await session.scalars(stmt)
-                    await session.commit()
-                    logger.info('Мероприятие удалено')
-                    return True
-                except DatabaseError as e:
-                    await session.rollback()
-                    logger.info(f'Ошибка при удалении мероприятия: {e}')
-                    return False
+                await session.scalars(stmt)
+                await self.bump_version(self.db)
+                logger.info('Мероприятие удалено')
+                return True
+            except DatabaseError as e:
+                logger.info(f'Ошибка при удалении мероприятия: {e}')
+                return False
@@ -1,4 +1,7 @@
 from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
 
 from src.common.base_dto import PydanticBaseModel
 from src.core.domain.events.event_members.response import EventMemberListResponse
@@ -9,3 +12,25 @@ class EventResponse(PydanticBaseModel):
     started_at: datetime
     finished_at: datetime
     members: list[EventMemberListResponse] | None = None
+
+
+class EventExportResponse(PydanticBaseModel):
+    name: str | None
+    started_at: datetime | None
+    finished_at: datetime | None
+    members: list[EventMemberListResponse]
+
+
+class EventPageResponse(BaseModel):
+    items: list[EventResponse]
+    next_cursor: str | None = None
+
+
+class BulkEventError(BaseModel):
+    index: int
+    detail: list[dict[str, Any]]
+
+
+class BulkCreateEventsResponse(BaseModel):
+    created: list[int]
+    errors: list[BulkEventError]
@@ -1,18 +1,54 @@
-from src.core.domain.events import requests, dto
+import csv
+import io
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pydantic import ValidationError
+
+from src.common.etag import make_etag
+from src.common.pagination import encode_cursor
+from src.common.container import container
+from src.core.domain.events import requests, dto, response
+from src.core.domain.events.cache import events_cache
+from src.core.domain.events.event_members.response import EventMemberListResponse
 from src.core.domain.events.event_members.repository import EventMemberRepository
 from src.core.domain.events.repository import EventRepository
 
 
 class EventService:
-    def __init__(
-            self
-    ) -> None:
-        self._repository = EventRepository()
-        self.event_member_repository = EventMemberRepository()
+    @property
+    def _repository(self) -> EventRepository:
+        return container.resolve(EventRepository)
+
+    @property
+    def event_member_repository(self) -> EventMemberRepository:
+        return container.resolve(EventMemberRepository)
 
     async def create(self, request: requests.CreateEvent) -> dto.EventView:
         create_data = dto.EventCreate.model_validate(request.model_dump())
-        return await self._repository.create(create_data)
+        event = await self._repository.create(create_data)
+        self._invalidate_cache()
+        return event
+
+    async def create_many(self, items: list[dict[str, Any]]) -> response.BulkCreateEventsResponse:
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                request = requests.CreateEvent.model_validate(item)
+            except ValidationError as e:
+                errors.append(response.BulkEventError(
+                    index=index,
+                    detail=e.errors(include_url=False, include_context=False, include_input=False)
+                ))
+                continue
+            valid.append(dto.EventCreate.model_validate(request.model_dump()))
+        created = await self._repository.create_many(valid)
+        if created:
+            self._invalidate_cache()
+        return response.BulkCreateEventsResponse(
+            created=created,
+            errors=errors
+        )
 
     async def get_all(
             self
@@ -22,6 +58,88 @@ class EventService:
     async def get(self, event_id: int) -> dto.EventView:
         return await self._repository.get_by_id(event_id=event_id)
 
+    async def get_etag(self, *parts) -> str:
+        stamp = events_cache.get(('stamp',))
+        if stamp is None:
+            stamp = await self._repository.get_stamp()
+            events_cache.set(('stamp',), stamp)
+        return make_etag(stamp, *parts)
+
+    async def get_all_with_members(self, query: dto.EventPageQuery) -> response.EventPageResponse:
+        key = ('page', query.limit, query.started_from, query.finished_to, query.after)
+        page = events_cache.get(key)
+        if page is not None:
+            return page
+        events = await self._repository.get_page(query)
+        next_cursor = None
+        if len(events) > query.limit:
+            events = events[:query.limit]
+            next_cursor = encode_cursor(events[-1].started_at, events[-1].id)
+        page = response.EventPageResponse(
+            items=await self._with_members(events),
+            next_cursor=next_cursor
+        )
+        events_cache.set(key, page)
+        return page
+
+    async def get_with_members(self, event_id: int) -> response.EventResponse | None:
+        key = ('event', event_id)
+        event_response = events_cache.get(key)
+        if event_response is not None:
+            return event_response
+        event = await self._repository.get_by_id(event_id=event_id)
+        if event is None:
+            return None
+        event_response = (await self._with_members([event]))[0]
+        events_cache.set(key, event_response)
+        return event_response
+
+    async def export(self, export_format: dto.ExportFormat) -> AsyncIterator[str]:
+        if export_format == dto.ExportFormat.CSV:
+            yield self._csv_row(['id', 'name', 'started_at', 'finished_at', 'members'])
+        async for event, members in self._repository.stream_with_members():
+            if export_format == dto.ExportFormat.CSV:
+                yield self._csv_row([
+                    event.id,
+                    event.name,
+                    event.started_at.isoformat() if event.started_at else '',
+                    event.finished_at.isoformat() if event.finished_at else '',
+                    ';'.join(members)
+                ])
+            else:
+                yield response.EventExportResponse(
+                    **event.model_dump(),
+                    members=[EventMemberListResponse(name=name) for name in members]
+                ).model_dump_json() + '\n'
+
+    @staticmethod
+    def _csv_row(values: list) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _to_response(event: dto.EventView, members: list[str]) -> response.EventResponse:
+        return response.EventResponse(
+            id=event.id,
+            name=event.name,
+            started_at=event.started_at,
+            finished_at=event.finished_at,
+            members=[EventMemberListResponse(name=name) for name in members]
+        )
+
+    async def _with_members(self, events: list[dto.EventView]) -> list[response.EventResponse]:
+        members = await self.event_member_repository.get_member_names_by_event_ids(
+            event_ids=[event.id for event in events]
+        )
+        return [self._to_response(event, members[event.id]) for event in events]
+
     async def delete(self, event_id: int):
         await self.event_member_repository.delete_by_event_id(event_id=event_id)
-        return await self._repository.delete(event_id=event_id)
+        deleted = await self._repository.delete(event_id=event_id)
+        self._invalidate_cache()
+        return deleted
+
+    def _invalidate_cache(self) -> None:
+        # cached pages embed members, so any write drops every entry
+        self._repository.db.after_commit(events_cache.invalidate)
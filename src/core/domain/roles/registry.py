@@ -0,0 +1,48 @@
+from collections.abc import Iterable
+
+from src.core.domain.roles.dto import RoleEnum, RoleView
+
+
+class RoleRegistry:
+    """
+    In-process map of role names to ids, loaded at startup and kept current by RoleService writes.
+
+    Lookups for a name that is not registered return None, so callers fall back to the database;
+    the registry therefore also works before it is loaded (e.g. in tests without the lifespan).
+    """
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self.loaded = False
+        # bumped on every change so callers can cache derived id sets
+        self.version = 0
+
+    def load(self, roles: Iterable[RoleView]) -> None:
+        self._ids = {role.name: role.id for role in roles}
+        self.loaded = True
+        self.version += 1
+
+    def set(self, role: RoleView) -> None:
+        self._ids[role.name] = role.id
+        self.version += 1
+
+    def remove(self, role_id: int) -> None:
+        self._ids = {name: id_ for name, id_ in self._ids.items() if id_ != role_id}
+        self.version += 1
+
+    def get(self, name: RoleEnum | str) -> RoleView | None:
+        name = name.value if isinstance(name, RoleEnum) else name
+        role_id = self._ids.get(name)
+        if role_id is None:
+            return None
+        return RoleView(id=role_id, name=name)
+
+    def ids_for(self, names: Iterable[RoleEnum | str]) -> frozenset[int]:
+        return frozenset(
+            self._ids[name]
+            for name in (name.value if isinstance(name, RoleEnum) else name for name in names)
+            if name in self._ids
+        )
+
+
+role_registry = RoleRegistry()
@@ -1,7 +1,7 @@
 from collections.abc import Sequence
 
 from loguru import logger
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, lambda_stmt
 from sqlalchemy.exc import DatabaseError
 
 from src.common.base import BaseRepository
@@ -12,24 +12,14 @@ from src.core.domain.roles import models
 class RoleRepository(BaseRepository):
     database_model = models.Role
     view_model = dto.RoleView
-
-    def __init__(self):
-        super().__init__()
-        self.base_stmt = self.__base_stmt()
-
-    def __base_stmt(self):
-        stmt = (
-            select(self.database_model)
-        )
-        return stmt
+    # roles are read before being created and loaded into the registry, so never from a lagging replica
+    replica_reads = False
 
     async def create(self, data: dto.CreateRole):
         async with self.session() as session:
-            async with session.begin():
-                model = self._pydantic_to_model(data, self.database_model())
-                session.add(model)
-                await session.commit()
-            await session.refresh(model)
+            model = self._pydantic_to_model(data, self.database_model())
+            session.add(model)
+            await session.flush()
             return model
 
     async def read(self, role_id: int) -> Sequence[models.Role] | bool:
@@ -38,40 +28,34 @@ class RoleRepository(BaseRepository):
                 self.database_model.id == role_id
             )
         )
-        async with self.session() as session:
+        async with self.session(read_only=True) as session:
             try:
                 result = (await session.scalars(stmt)).first()
-                logger.info('Роль прочитана')
-                return self._model_to_pydantic(result, self.view_model)
             except DatabaseError as e:
-                await session.rollback()
                 logger.info(f'Ошибка при чтении роли: {e}')
                 return False
+        logger.info('Роль прочитана')
+        return self._model_to_pydantic(result, self.view_model)
 
     async def read_by_name(self, name: str):
-        async with self.session() as session:
-            async with session.begin():
-                stmt = (
-                    self.base_stmt
-                    .where(self.database_model.name == name)
-                )
-                item = (await session.scalars(stmt)).unique().first()
-                if item:
-                    return self._model_to_pydantic(item, self.view_model)
+        stmt = lambda_stmt(lambda: select(models.Role).where(models.Role.name == name))
+        async with self.session(read_only=True) as session:
+            item = (await session.scalars(stmt)).unique().first()
+        if item:
+            return self._model_to_pydantic(item, self.view_model)
 
     async def read_all(self) -> list:
         stmt = (
             select(models.Role)
         )
-        async with self.session() as session:
+        async with self.session(read_only=True) as session:
             try:
                 result = (await session.scalars(stmt)).all()
-                logger.info('Все роли прочитаны')
-                return [self._model_to_pydantic(sa_model, dto.RoleView) for sa_model in result]
             except DatabaseError as e:
-                await session.rollback()
                 logger.info(f'Ошибка при чтении всех ролей: {e}')
                 return []
+        logger.info('Все роли прочитаны')
+        return [self._model_to_pydantic(sa_model, dto.RoleView) for sa_model in result]
 
     async def delete(self, role_id: int) -> bool:
         stmt = (
@@ -82,10 +66,8 @@ class RoleRepository(BaseRepository):
         async with self.session() as session:
             try:
                 await session.scalars(stmt)
-                await session.commit()
                 logger.info('Роль удалена')
                 return True
             except DatabaseError as e:
-                await session.rollback()
                 logger.info(f'Ошибка при удалении роли: {e}')
                 return False
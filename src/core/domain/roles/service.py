@@ -1,20 +1,25 @@
+from src.common.container import container
 from src.core.domain.roles import requests, dto
 from src.core.domain.roles.dto import RoleView
+from src.core.domain.roles.registry import role_registry
 from src.core.domain.roles.repository import RoleRepository
+from src.core.domain.users.cache import users_cache
 
 
 class RoleService:
-    def __init__(
-            self
-    ) -> None:
-        self.repository = RoleRepository()
+    @property
+    def repository(self) -> RoleRepository:
+        return container.resolve(RoleRepository)
+
+    async def load_registry(self) -> None:
+        role_registry.load(await self.read_all())
 
     async def create(
             self,
             request: requests.CreateRole
     ) -> RoleView:
         data = dto.CreateRole(name=request.name)
-        return await self.repository.create(data)
+        return await self._create(data)
 
     async def read(
             self,
@@ -34,26 +39,36 @@ class RoleService:
             self,
             role_id: int
     ) -> bool:
-        return await self.repository.delete(role_id)
+        deleted = await self.repository.delete(role_id)
+
+        def apply():
+            role_registry.remove(role_id)
+            users_cache.invalidate_where(lambda user: user.role is not None and user.role.id == role_id)
+
+        self.repository.db.after_commit(apply)
+        return deleted
 
     async def get_or_create_role_by_name(self, name: str) -> RoleView:
-        name = dto.RoleEnum[name].value
-        role = await self.get_by_name(name=name)
-        if not role:
-            data = dto.CreateRole(name=name)
-            return await self.repository.create(data)
-        return role
+        return await self._get_or_create(dto.RoleEnum[name].value)
 
     async def get_or_create_user_role(self) -> RoleView:
-        role = await self.get_by_name(name=dto.RoleEnum.USER.value)
-        if not role:
-            data = dto.CreateRole(name=dto.RoleEnum.USER.value)
-            return await self.repository.create(data)
-        return role
+        return await self._get_or_create(dto.RoleEnum.USER.value)
 
     async def get_or_create_admin_role(self) -> RoleView:
-        role = await self.get_by_name(name=dto.RoleEnum.ADMIN.value)
+        return await self._get_or_create(dto.RoleEnum.ADMIN.value)
+
+    async def _get_or_create(self, name: str) -> RoleView:
+        role = role_registry.get(name)
+        if role is not None:
+            return role
+        role = await self.get_by_name(name=name)
         if not role:
-            data = dto.CreateRole(name=dto.RoleEnum.ADMIN.value)
-            return await self.repository.create(data)
+            return await self._create(dto.CreateRole(name=name))
+        role_registry.set(role)
+        return role
+
+    async def _create(self, data: dto.CreateRole) -> RoleView:
+        model = await self.repository.create(data)
+        role = RoleView(id=model.id, name=model.name)
+        self.repository.db.after_commit(lambda: role_registry.set(role))
         return role
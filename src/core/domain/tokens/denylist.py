@@ -0,0 +1,58 @@
+import time
+
+from src.common.fastapi_jwt_auth import AuthJWT
+
+
+class TokenDenylist:
+    """
+    Process-local set of revoked token ids (jti -> exp).
+
+    A check is a single dict lookup and never does I/O. Each worker fills it from the
+    revoked_tokens table incrementally (rows with id above the last one seen) and drops
+    entries once the token would have expired anyway.
+    """
+
+    def __init__(self) -> None:
+        self._revoked: dict[str, float] = {}
+        self.last_id = 0
+        self.checks = 0
+        self.rejected = 0
+        self.synced_at: float | None = None
+
+    def is_revoked(self, jti: str | None) -> bool:
+        self.checks += 1
+        if jti in self._revoked:
+            self.rejected += 1
+            return True
+        return False
+
+    def add(self, jti: str, exp: float) -> None:
+        self._revoked[jti] = exp
+
+    def load(self, rows: list[tuple[int, str, float]]) -> None:
+        for row_id, jti, exp in rows:
+            self._revoked[jti] = exp
+            self.last_id = max(self.last_id, row_id)
+        self.synced_at = time.time()
+
+    def sweep(self, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        for jti in [jti for jti, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[jti]
+
+    def statistics(self) -> dict:
+        return {
+            "size": len(self._revoked),
+            "last_id": self.last_id,
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "synced_at": self.synced_at,
+        }
+
+
+token_denylist = TokenDenylist()
+
+
+@AuthJWT.token_in_denylist_loader
+def check_if_token_in_denylist(decrypted_token: dict) -> bool:
+    return token_denylist.is_revoked(decrypted_token.get('jti'))
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from src.common.base_dto import PydanticBaseModel
+
+
+class RevokedToken(PydanticBaseModel):
+    jti: str
+    expires_at: datetime
+
+
+class RevokedTokenView(RevokedToken):
+    ...
+
+
+class RevokedTokenCreate(BaseModel):
+    jti: str
+    expires_at: datetime
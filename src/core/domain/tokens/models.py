@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, Index
+
+from src.common.mixins.models import PrimaryKeyMixin
+from src.db.engine import Base
+
+
+class RevokedToken(Base, PrimaryKeyMixin):
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = (
+        Index('ux_revoked_tokens_jti', 'jti', unique=True),
+        Index('ix_revoked_tokens_expires_at', 'expires_at'),
+    )
+
+    jti = Column(String(64), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy import select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DatabaseError
+
+from src.common.base import BaseRepository
+from src.core.domain.tokens import dto
+from src.core.domain.tokens.models import RevokedToken
+
+SYNC_BATCH_SIZE = 10000
+# ids are allocated before commit, so a sync also re-reads the last few ids it has already seen;
+# a revocation committed later than that is only picked up by the next full sync
+SYNC_OVERLAP_IDS = 100
+
+
+class RevokedTokenRepository(BaseRepository):
+    database_model = RevokedToken
+    view_model = dto.RevokedTokenView
+    # a revocation must be seen by the next sync, replicas may lag behind it
+    replica_reads = False
+
+    async def create(self, data: dto.RevokedTokenCreate) -> bool:
+        """Revokes idempotently: returns whether the token was revoked by this call."""
+        async with self.session() as session:
+            insert = postgresql.insert if session.bind.dialect.name == 'postgresql' else sqlite.insert
+            stmt = (
+                insert(self.database_model)
+                .values(**data.model_dump())
+                .on_conflict_do_nothing(index_elements=['jti'])
+                .returning(self.database_model.id)
+            )
+            return (await session.execute(stmt)).scalar_one_or_none() is not None
+
+    async def get_after(self, last_id: int, now: datetime) -> list[tuple[int, str, datetime]]:
+        """Unexpired revocations added after last_id, oldest first."""
+        stmt = (
+            select(self.database_model.id, self.database_model.jti, self.database_model.expires_at)
+            .where(self.database_model.id > last_id)
+            .where(self.database_model.expires_at > now)
+            .order_by(self.database_model.id)
+            .limit(SYNC_BATCH_SIZE)
+        )
+        async with self.session(read_only=True) as session:
+            rows = (await session.execute(stmt)).all()
+        return [tuple(row) for row in rows]
+
+    async def delete_expired(self, now: datetime) -> int:
+        stmt = (
+            delete(self.database_model)
+            .where(self.database_model.expires_at <= now)
+        )
+        async with self.session() as session:
+            try:
+                result = await session.execute(stmt)
+                return result.rowcount
+            except DatabaseError as e:
+                logger.info(f'Ошибка при удалении истекших токенов: {e}')
+                return 0
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from src.common.container import container
+from src.common.fastapi_jwt_auth import AuthJWT
+from src.core.domain.tokens import dto
+from src.core.domain.tokens.denylist import token_denylist
+from src.core.domain.tokens.repository import SYNC_BATCH_SIZE, SYNC_OVERLAP_IDS, RevokedTokenRepository
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _to_datetime(exp: float) -> datetime:
+    return datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+
+
+def _to_timestamp(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TokenService:
+    @property
+    def _repository(self) -> RevokedTokenRepository:
+        return container.resolve(RevokedTokenRepository)
+
+    async def revoke(self, encoded_token: str, claims: dict) -> bool:
+        """Adds the token to the denylist until its exp; tokens without exp cannot be revoked here."""
+        exp = claims.get('exp')
+        if exp is None:
+            return False
+        revoked = await self._repository.create(dto.RevokedTokenCreate(
+            jti=claims['jti'],
+            expires_at=_to_datetime(exp)
+        ))
+
+        def apply():
+            token_denylist.add(claims['jti'], exp)
+            AuthJWT.evict_token(encoded_token)
+
+        self._repository.db.after_commit(apply)
+        return revoked
+
+    async def sync(self, full: bool = False) -> None:
+        """
+        Pulls revocations made by other workers since the last sync and forgets expired ones.
+
+        Ids are allocated before commit, so a revocation can commit after rows with higher ids
+        were already synced. An incremental sync only re-reads SYNC_OVERLAP_IDS ids back; a full
+        one re-reads every unexpired revocation and so bounds how long such a row stays unseen.
+        """
+        last_id = 0 if full else max(0, token_denylist.last_id - SYNC_OVERLAP_IDS)
+        while True:
+            rows = await self._repository.get_after(last_id, _utc_now())
+            token_denylist.load([(row_id, jti, _to_timestamp(expires_at)) for row_id, jti, expires_at in rows])
+            if len(rows) < SYNC_BATCH_SIZE:
+                break
+            last_id = rows[-1][0]
+        token_denylist.sweep()
+
+    async def delete_expired(self) -> int:
+        return await self._repository.delete_expired(_utc_now())
+
+    async def run_sync(self, interval: float, sweep_every: int, full_sync_every: int) -> None:
+        """Background loop started after the initial sync; one failed round does not stop it."""
+        rounds = 0
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync(full=(rounds + 1) % full_sync_every == 0)
+                rounds += 1
+                if rounds % sweep_every == 0:
+                    deleted = await self.delete_expired()
+                    if deleted:
+                        logger.info(f'Удалено истекших токенов: {deleted}')
+            except Exception as e:
+                logger.info(f'Ошибка при синхронизации отозванных токенов: {e}')
@@ -4,9 +4,11 @@ from fastapi import Depends, HTTPException
 from starlette import status
 from starlette.requests import Request
 
+from src.common.container import container
 from src.core.domain.users.service import oauth2_scheme, UserService
 from . import dto
 from ..roles.dto import RoleEnum
+from ..roles.registry import role_registry
 
 
 class Auth:
@@ -18,28 +20,44 @@ class Auth:
             self.roles = [roles]
         else:
             self.roles = roles
+        self._role_ids: frozenset[int] = frozenset()
+        self._role_ids_version = -1
 
     async def __call__(
             self,
             request: Request,
             token: str = Depends(oauth2_scheme),
-            service: UserService = Depends(),
+            service: UserService = Depends(container.provider(UserService)),
     ) -> dto.UserView:
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверные авторизационные данные",
             headers={"WWW-Authenticate": "Bearer"},
         )
-        user = await service.get_user(token)
+        claims = service.get_claims(token)
+        request.state.jwt_claims = claims
+        user = await service.get_user_by_claims(claims)
         if user is None or not self.check_user(user):
             raise credentials_exception from None
         return user
 
     def check_user(self, user: dto.UserView) -> bool:
-        if user.role in self.roles or user.role.name in self.roles:
+        if self.roles is None:
             return True
+        if user.role is not None:
+            if user.role.id in self.role_ids():
+                return True
+            # roles missing from the registry are still matched by name
+            if user.role.name in self.roles:
+                return True
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Недостаточно прав",
             headers={"WWW-Authenticate": "Bearer"}
         )
+
+    def role_ids(self) -> frozenset[int]:
+        if self._role_ids_version != role_registry.version:
+            self._role_ids = role_registry.ids_for(self.roles)
+            self._role_ids_version = role_registry.version
+        return self._role_ids
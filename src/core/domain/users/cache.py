@@ -0,0 +1,7 @@
+from src.common.cache import StatsCache
+from src.settings import CacheSettings, get_settings
+
+_settings = get_settings(CacheSettings)
+
+# UserView of authenticated users, keyed by the token subject (username)
+users_cache = StatsCache(maxsize=_settings.users_maxsize, ttl=_settings.users_ttl)
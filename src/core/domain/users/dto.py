@@ -15,6 +15,7 @@ class AuthUser(BaseModel):
 class UpdateUser(BaseModel):
     first_name: str
     username: str
+    # already hashed by password_hasher, stored as is
     password: str | None = None
 
 
@@ -41,6 +42,7 @@ class CreatedUserId(BaseModel):
 class CreateUser(BaseModel):
     first_name: str
     username: str
+    # already hashed by password_hasher, stored as is
     password: str
     role_id: int
 
@@ -0,0 +1,11 @@
+from src.common.hashing import PasswordHasher
+from src.core.domain.users.models import User
+from src.settings import AuthSettings, get_settings
+
+_settings = get_settings(AuthSettings)
+
+# same CryptContext as the users.password column, so hashes made here are stored as is
+password_hasher = PasswordHasher(
+    context=User.password.type.context,
+    max_workers=_settings.password_hash_workers
+)
@@ -1,89 +1,76 @@
 from loguru import logger
-from passlib.hash import pbkdf2_sha512
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, lambda_stmt
 from sqlalchemy.exc import DatabaseError
 from sqlalchemy.orm import joinedload
+from sqlalchemy_utils import Password
 
 from src.common.base import BaseRepository
+from src.core.domain.events.repository import EventRepository
 from src.core.domain.users import dto
 from src.core.domain.users import models
+from src.core.domain.users.passwords import password_hasher
 
 
 class UserRepository(BaseRepository):
     database_model = models.User
     view_model = dto.ReturnedUser
 
-    def __init__(self):
-        super().__init__()
-        self.base_stmt = self.__base_stmt()
-
-    def __base_stmt(self):
-        stmt = (
-            select(self.database_model)
-            .options(joinedload(self.database_model.role))
+    @staticmethod
+    def _by_id_stmt(user_id: int):
+        return lambda_stmt(
+            lambda: select(models.User)
+            .options(joinedload(models.User.role))
+            .where(models.User.id == user_id)
         )
-        return stmt
 
     async def create(self, data: dto.CreateUser) -> dto.UnprotectedUserView:
         async with self.session() as session:
-            async with session.begin():
-                model = self._pydantic_to_model(data, self.database_model())
-                session.add(model)
-                await session.commit()
-            await session.refresh(model)
+            model = self._pydantic_to_model(data, self.database_model())
+            model.password = Password(data.password)
+            session.add(model)
+            await session.flush()
             return self._model_to_pydantic(model, dto.UnprotectedUserView)
 
     async def read_encoded(self, user_data: dto.AuthUser) -> dto.AuthUser | bool:
-        passHash = pbkdf2_sha512.encrypt(user_data.password)
-        stmt = (
-            select(self.database_model)
-            .where(self.database_model.username == user_data.username)
-        )
+        username = user_data.username
+        stmt = lambda_stmt(lambda: select(models.User).where(models.User.username == username))
 
-        async with self.session() as session:
+        async with self.session(read_only=True) as session:
             model = (await session.scalars(stmt)).unique().first()
-            print(f'model: {model}')
-            if model:
-                user = self._model_to_pydantic(model, dto.UnprotectedUserView)
-                if pbkdf2_sha512.verify(user_data.password, passHash):
-                    return dto.AuthUser(
-                        first_name=user.first_name,
-                        username=user.username,
-                        password=passHash,
-                    )
+        if model and model.password is not None:
+            if await password_hasher.verify(user_data.password, model.password.hash):
+                return dto.AuthUser(
+                    username=model.username,
+                    password=model.password.hash.decode(),
+                )
 
         return False
 
     async def read(self, user_id: int) -> dto.UserView:
-        async with self.session() as session:
-            async with session.begin():
-                stmt = (
-                    self.base_stmt
-                    .where(self.database_model.id == user_id)
-                )
-                item = (await session.scalars(stmt)).unique().first()
-                if item:
-                    return self._model_to_pydantic(item, dto.UserView)
+        stmt = self._by_id_stmt(user_id)
+        async with self.session(read_only=True) as session:
+            item = (await session.scalars(stmt)).unique().first()
+        if item:
+            return self._model_to_pydantic(item, dto.UserView)
 
     async def read_unprotected(self, user_id: int) -> dto.UnprotectedUserView:
-        async with self.session() as session:
-            async with session.begin():
-                stmt = (
-                    self.base_stmt
-                    .where(self.database_model.id == user_id)
-                )
-                model = (await session.scalars(stmt)).unique().first()
-                if model:
-                    return self._model_to_pydantic(model, dto.UnprotectedUserView)
+        stmt = self._by_id_stmt(user_id)
+        async with self.session(read_only=True) as session:
+            model = (await session.scalars(stmt)).unique().first()
+        if model:
+            return self._model_to_pydantic(model, dto.UnprotectedUserView)
 
     async def update(self, update_data: dto.UpdateUser,
                      model: dto.ReturnedUser):
         async with self.session() as session:
-            async with session.begin():
-                model = self._pydantic_to_model(model, self.database_model())
-                update_model = self._pydantic_to_model(update_data, model)
-                updated_item = await session.merge(update_model)
-            await session.commit()
+            model = self._pydantic_to_model(model, self.database_model())
+            update_model = self._pydantic_to_model(update_data, model)
+            if update_data.password is not None:
+                update_model.password = Password(update_data.password)
+            updated_item = await session.merge(update_model)
+            await session.flush()
+            # member lists of events show the first name
+            await EventRepository.bump_version(self.db)
             return updated_item
 
     async def delete(self, user_id: int) -> bool:
@@ -95,20 +82,20 @@ class UserRepository(BaseRepository):
         async with self.session() as session:
             try:
                 await session.scalars(stmt)
-                await session.commit()
+                await EventRepository.bump_version(self.db)
                 logger.info('Пользователь удален')
                 return True
             except DatabaseError as e:
-                await session.rollback()
                 logger.info(f'Ошибка при удалении пользователя: {e}')
                 return False
 
     async def get_user_by_username(self, username: str) -> dto.UserView:
-        async with self.session() as session:
-            stmt = (
-                self.base_stmt
-                .where(self.database_model.username == username)
-            )
+        stmt = lambda_stmt(
+            lambda: select(models.User)
+            .options(joinedload(models.User.role))
+            .where(models.User.username == username)
+        )
+        async with self.session(read_only=True) as session:
             model = (await session.scalars(stmt)).unique().first()
-            if model:
-                return self._model_to_pydantic(model, dto.UserView)
+        if model:
+            return self._model_to_pydantic(model, dto.UserView)
@@ -19,3 +19,7 @@ class RegisterUser(BaseModel):
 
 class ResetPasswordRequest(BaseModel):
     password: str
+
+
+class Logout(BaseModel):
+    refresh_token: str | None = None
@@ -1,16 +1,27 @@
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 
 from fastapi import Depends, HTTPException, status
-from jose import jwt, JWTError
 
+from src.common.container import container
+from src.common.fastapi_jwt_auth import AuthJWT
+from src.common.fastapi_jwt_auth.exceptions import AuthJWTException
+from src.core.domain.events.cache import events_cache
+from src.core.domain.roles.dto import RoleView
 from src.core.domain.roles.service import RoleService
 from src.core.domain.users import requests, dto
+from src.core.domain.users.cache import users_cache
+from src.core.domain.users.passwords import password_hasher
 from src.core.domain.users.dto import (
     AuthUser,
     TokenData
 )
 from src.core.domain.users.repository import UserRepository
-from src.settings import SECRET_KEY, ALGORITHM, oauth2_scheme
+from src.settings import (
+    ACCESS_TOKEN_EXPIRE_DAYS,
+    AuthSettings,
+    get_settings,
+    oauth2_scheme
+)
 
 
 class UserService:
@@ -18,8 +29,15 @@ class UserService:
     def __init__(
             self
     ) -> None:
-        self.repository = UserRepository()
-        self.role_service = RoleService()
+        self.settings = get_settings(AuthSettings)
+
+    @property
+    def repository(self) -> UserRepository:
+        return container.resolve(UserRepository)
+
+    @property
+    def role_service(self) -> RoleService:
+        return container.resolve(RoleService)
 
     async def authenticate(
             self,
@@ -27,42 +45,106 @@ class UserService:
     ) -> AuthUser:
         return await self.repository.read_encoded(user_data)
 
-    def create_access_token(self, data: dict, expires_delta: timedelta | None = None):
-        to_encode = data.copy()
-        if expires_delta:
-            expire = datetime.now(timezone.utc) + expires_delta
+    def issue_access_token(self, Authorize: AuthJWT, user: dto.UserView) -> str:
+        if self.settings.stateless:
+            expires_time = timedelta(minutes=self.settings.stateless_access_token_expire_minutes)
         else:
-            expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+            expires_time = timedelta(days=int(ACCESS_TOKEN_EXPIRE_DAYS))
+        return Authorize.create_access_token(
+            subject=user.username,
+            expires_time=expires_time,
+            user_claims=self.user_claims(user)
+        )
+
+    def issue_tokens(self, Authorize: AuthJWT, user: dto.UserView) -> dto.Token:
+        refresh_token = Authorize.create_refresh_token(
+            subject=user.username,
+            expires_time=timedelta(days=int(ACCESS_TOKEN_EXPIRE_DAYS))
+        )
+        return dto.Token(access_token=self.issue_access_token(Authorize, user), refresh_token=refresh_token)
+
+    @staticmethod
+    def user_claims(user: dto.UserView) -> dict:
+        if user.role is None:
+            return {'uid': user.id, 'name': user.first_name}
+        return {'uid': user.id, 'name': user.first_name, 'role': user.role.name, 'role_id': user.role.id}
 
-        return encoded_jwt
+    @staticmethod
+    def user_from_claims(payload: dict) -> dto.UserView | None:
+        """UserView rebuilt from a verified access token, or None for tokens issued without role claims."""
+        if payload.get('type', 'access') != 'access' or 'uid' not in payload or 'role' not in payload:
+            return None
+        return dto.UserView(
+            id=payload['uid'],
+            first_name=payload['name'],
+            username=payload['sub'],
+            role=RoleView(id=payload['role_id'], name=payload['role'])
+        )
 
     async def get_by_username(self, username: str) -> dto.UserView:
         return await self.repository.get_user_by_username(username)
 
+    def get_claims(self, token: str) -> dict:
+        """Verifies an access token through the AuthJWT pipeline; any token error becomes a 401."""
+        try:
+            return AuthJWT().verify_access_token(token)
+        except AuthJWTException:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Неверные авторизационные данные",
+                headers={"WWW-Authenticate": "Bearer"},
+            ) from None
+
     async def get_user(self, token: str = Depends(oauth2_scheme)) -> dto.UserView:
+        return await self.get_user_by_claims(self.get_claims(token))
+
+    async def get_user_by_claims(self, payload: dict) -> dto.UserView:
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверные авторизационные данные",
             headers={"WWW-Authenticate": "Bearer"},
         )
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            username: str = payload.get("sub")
-            if username is None:
-                raise credentials_exception
-            token_data = TokenData(username=username)
-        except JWTError:
+        username = payload.get("sub")
+        if username is None:
             raise credentials_exception
-        user = await self.get_by_username(token_data.username)
+        token_data = TokenData(username=username)
+        if self.settings.stateless:
+            user = self.user_from_claims(payload)
+            if user is not None:
+                return user
+        user = users_cache.get(token_data.username)
         if user is None:
-            raise credentials_exception
+            user = await self.get_by_username(token_data.username)
+            if user is None:
+                raise credentials_exception
+            users_cache.set(token_data.username, user)
         return user
 
+    async def update(self, update_data: dto.UpdateUser, user: dto.ReturnedUser):
+        if update_data.password is not None:
+            hashed = await password_hasher.hash(update_data.password)
+            update_data = update_data.model_copy(update={'password': hashed})
+        updated_user = await self.repository.update(update_data, user)
+        self._invalidate_cache(user.id)
+        return updated_user
+
+    async def delete(self, user_id: int) -> bool:
+        deleted = await self.repository.delete(user_id)
+        self._invalidate_cache(user_id)
+        return deleted
+
+    def _invalidate_cache(self, user_id: int) -> None:
+        # entries are keyed by username, which an update may have changed
+        self.repository.db.after_commit(
+            lambda: users_cache.invalidate_where(lambda user: user.id == user_id)
+        )
+        # event pages embed member names
+        self.repository.db.after_commit(events_cache.invalidate)
+
     async def register(self, request: requests.RegisterUser, role_name: str) -> dto.UnprotectedUserView:
         role = await self.role_service.get_or_create_role_by_name(role_name)
         request_data = request.model_dump()
         request_data['role_id'] = role.id
+        request_data['password'] = await password_hasher.hash(request.password)
         user_data = dto.CreateUser.model_validate(request_data)
         return await self.repository.create(user_data)
@@ -0,0 +1,82 @@
+import math
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.settings import get_settings, DatabaseSettings
+
+COOKIE_NAME = "read_position"
+_LSN = re.compile(r"[0-9A-F]{1,8}/[0-9A-F]{1,8}")
+
+
+@dataclass
+class ReadPosition:
+    """
+    Where the client's last committed write landed: its wall-clock time and, on Postgres, the
+    WAL position of the primary right after it. Reads of this client only go to a replica that
+    has replayed that far.
+    """
+    committed_at: float = 0.0
+    lsn: str | None = None
+
+    def encode(self) -> str:
+        return f"{self.committed_at:.3f}:{self.lsn or ''}"
+
+    @classmethod
+    def decode(cls, value: str | None) -> "ReadPosition":
+        """Parses the cookie; anything malformed is treated as a client that has not written."""
+        committed_at, _, lsn = (value or "").partition(":")
+        try:
+            committed_at = float(committed_at)
+        except ValueError:
+            return cls()
+        if not math.isfinite(committed_at):
+            return cls()
+        # a time in the future would pin the client to the primary indefinitely
+        return cls(committed_at=min(committed_at, time.time()), lsn=lsn if _LSN.fullmatch(lsn) else None)
+
+
+# position of the client whose request is being served; None outside of a request
+read_position: ContextVar[ReadPosition | None] = ContextVar("read_position", default=None)
+
+
+class ReadPositionMiddleware:
+    """
+    Carries ReadPosition between requests of one client in a cookie, so read-your-writes holds
+    per client whichever worker serves the next request. The cookie expires with the sticky
+    window, after which the client's reads may go to any replica.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._max_age = math.ceil(get_settings(DatabaseSettings).replica_sticky_seconds)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        received = HTTPConnection(scope).cookies.get(COOKIE_NAME)
+        position = ReadPosition.decode(received)
+        token = read_position.set(position)
+
+        async def send_with_position(message: Message) -> None:
+            if message["type"] == "http.response.start" and position.committed_at:
+                value = position.encode()
+                # only a write made while serving this request moves the position
+                if value != received:
+                    MutableHeaders(scope=message).append(
+                        "set-cookie",
+                        f"{COOKIE_NAME}={value}; Max-Age={self._max_age}; Path=/; HttpOnly; SameSite=lax"
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_position)
+        finally:
+            read_position.reset(token)
@@ -1,38 +1,302 @@
+import itertools
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
-from sqlalchemy import orm, NullPool
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import event, exc, make_url, orm, text, NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from starlette.requests import Request
 
+from src.db.consistency import ReadPosition, read_position
+from src.db.pool import InstrumentedAsyncQueuePool
+from src.db.statements import StatementCacheStatistics, instrument_statement_cache
 from src.settings import get_settings, DatabaseSettings
 
 
+# replay lag of a replica; one that has replayed everything it received is not behind, however
+# long ago its last replayed transaction was
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
 class Base(orm.DeclarativeBase):
     pass
 
 
+class TrackingSession(orm.Session):
+    """Session that remembers whether it wrote anything, for read-your-writes routing."""
+
+
+@event.listens_for(TrackingSession, "do_orm_execute")
+def _mark_dml(orm_execute_state: orm.ORMExecuteState) -> None:
+    # anything that is not a plain select (DML, raw text) counts as a write
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(TrackingSession, "after_flush")
+def _mark_flush(session: orm.Session, _flush_context) -> None:
+    session.info["wrote"] = True
+
+
 class DatabaseEngine:
-    def __init__(self, db_url: str, debug: bool, create_db: bool = False) -> None:
-        self._engine = create_async_engine(db_url, echo=debug, future=True, poolclass=NullPool)
+    def __init__(
+            self,
+            db_url: str,
+            debug: bool,
+            create_db: bool = False,
+            pooled: bool = True,
+            replica_urls: list[str] | None = None,
+    ) -> None:
         self._settings = get_settings(DatabaseSettings)
+        # compiled-SQL cache counters of every engine, primary first
+        self._statement_caches: dict[AsyncEngine, StatementCacheStatistics] = {}
+        self._engine = self._create_engine(db_url, debug, pooled)
         self._session_factory = async_sessionmaker(
             autocommit=False,
             autoflush=False,
+            expire_on_commit=False,
             bind=self._engine,
+            sync_session_class=TrackingSession,
+        )
+        # single-shot reads run on autocommit connections: no BEGIN/COMMIT around one SELECT;
+        # streamed reads need a transaction for the server-side cursor, a READ ONLY one on Postgres
+        self._read_session_factories = self._read_sessionmakers(self._engine)
+        self._replicas = [self._create_engine(replica_url, debug, pooled) for replica_url in replica_urls or []]
+        self._replica_session_factories = itertools.cycle([
+            (replica, self._read_sessionmakers(replica)) for replica in self._replicas
+        ])
+        self._create_db = create_db
+        self._tables_created = False
+        self._current_session: ContextVar[AsyncSession | None] = ContextVar(
+            f"unit_of_work_{id(self)}", default=None
         )
         self._connection_pool = None
         self.con = None
 
+    def _create_engine(self, db_url: str, debug: bool, pooled: bool) -> AsyncEngine:
+        connect_args = {}
+        if make_url(db_url).get_driver_name() == "asyncpg":
+            connect_args["prepared_statement_cache_size"] = self._settings.prepared_statement_cache_size
+        engine = create_async_engine(
+            db_url,
+            echo=debug,
+            future=True,
+            query_cache_size=self._settings.query_cache_size,
+            connect_args=connect_args,
+            **self._pool_options(pooled and self._settings.pool_enabled),
+        )
+        self._statement_caches[engine] = instrument_statement_cache(engine.sync_engine)
+        return engine
+
+    @staticmethod
+    def _read_sessionmakers(engine: AsyncEngine) -> tuple[async_sessionmaker, async_sessionmaker]:
+        """Session factories for (single-shot, streamed) reads against engine."""
+        stream_options = {"postgresql_readonly": True} if engine.dialect.name == "postgresql" else {}
+        return (
+            async_sessionmaker(
+                autoflush=False,
+                expire_on_commit=False,
+                bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+            ),
+            async_sessionmaker(
+                autoflush=False,
+                expire_on_commit=False,
+                bind=engine.execution_options(**stream_options),
+            ),
+        )
+
+    def _pool_options(self, pooled: bool) -> dict:
+        if not pooled:
+            return {"poolclass": NullPool}
+        return {
+            "poolclass": InstrumentedAsyncQueuePool,
+            "pool_size": self._settings.pool_size,
+            "max_overflow": self._settings.pool_max_overflow,
+            "pool_pre_ping": self._settings.pool_pre_ping,
+            "pool_recycle": self._settings.pool_recycle,
+            "pool_timeout": self._settings.pool_timeout,
+        }
+
+    def pool_statistics(self) -> dict:
+        pool = self._engine.pool
+        if isinstance(pool, InstrumentedAsyncQueuePool):
+            return pool.statistics.as_dict(pool)
+        return {"pool": type(pool).__name__}
+
+    def statement_cache_statistics(self) -> list[dict]:
+        """Compiled-SQL cache usage of the primary and of every replica, each engine on its own."""
+        return [
+            {
+                "engine": "primary" if engine is self._engine else "replica",
+                "url": engine.url.render_as_string(hide_password=True),
+                **statistics.as_dict(engine.sync_engine),
+            }
+            for engine, statistics in self._statement_caches.items()
+        ]
+
+    async def replica_statistics(self) -> list[dict]:
+        """Pool usage and replay lag of every replica; lag is measured on demand."""
+        statistics = []
+        for replica in self._replicas:
+            lag, available = None, True
+            if replica.dialect.name == "postgresql":
+                try:
+                    async with replica.connect() as conn:
+                        lag = (await conn.execute(text(REPLICA_LAG_SQL))).scalar()
+                except (OSError, exc.DBAPIError):
+                    available = False
+            pool = replica.pool
+            statistics.append({
+                "url": replica.url.render_as_string(hide_password=True),
+                "available": available,
+                "lag_seconds": float(lag) if lag is not None else None,
+                "pool": pool.statistics.as_dict(pool) if isinstance(pool, InstrumentedAsyncQueuePool)
+                else {"pool": type(pool).__name__},
+            })
+        return statistics
+
+    async def dispose(self) -> None:
+        await self._engine.dispose()
+        for replica in self._replicas:
+            await replica.dispose()
+
     @asynccontextmanager
-    async def session(self) -> async_sessionmaker[AsyncSession]:
-        session: AsyncSession = self._session_factory()
-        try:
+    async def unit_of_work(self) -> AsyncIterator[AsyncSession]:
+        """
+        Opens one session and transaction shared by every repository call made inside the block.
+        Commits when the block exits normally and rolls back on exception. Nested calls join
+        the outer unit of work.
+        """
+        session = self._current_session.get()
+        if session is not None:
             yield session
-        except Exception:
-            await session.rollback()
-            raise
+            return
+
+        await self._ensure_tables()
+        session = self._session_factory()
+        token = self._current_session.set(session)
+        try:
+            async with session.begin():
+                yield session
         finally:
+            self._current_session.reset(token)
             await session.close()
+        if session.info.get("wrote"):
+            await self._record_write()
+        # only reached on commit; the unit of work is closed, so callbacks may open their own
+        for callback in session.info.get("after_commit", []):
+            result = callback()
+            if result is not None:
+                await result
+
+    @asynccontextmanager
+    async def session(
+            self,
+            read_only: bool = False,
+            replica: bool = True,
+            stream: bool = False,
+    ) -> AsyncIterator[AsyncSession]:
+        """
+        Returns the session of the current unit of work, or a short-lived one if none is active.
+
+        read_only sessions are separate autocommit sessions, closed (and their connection
+        released) as soon as the block exits. With stream set they run in a read-only
+        transaction instead, which server-side cursors (stream(), yield_per) require. Once the
+        unit of work has written, reads join it so they see its changes. With replica set they
+        go to a replica, unless the client committed a write within the sticky window that the
+        replica has not replayed yet, so every client reads its own writes.
+        """
+        current = self._current_session.get()
+        if read_only and (current is None or not current.info.get("wrote")):
+            await self._ensure_tables()
+            factories = self._read_session_factories
+            if replica and self._replicas:
+                factories = await self._replica_factories()
+            read_factory, stream_factory = factories
+            if stream:
+                async with stream_factory() as session, session.begin():
+                    yield session
+            else:
+                async with read_factory() as session:
+                    yield session
+            return
+        async with self.unit_of_work() as session:
+            yield session
+
+    async def _record_write(self) -> None:
+        """Moves the client's read position past the write just committed."""
+        position = read_position.get()
+        if position is None or not self._replicas:
+            return
+        position.committed_at = time.time()
+        position.lsn = None
+        if self._engine.dialect.name == "postgresql":
+            # read after the commit, so a replica at this LSN has replayed the commit record
+            async with self._engine.connect() as conn:
+                position.lsn = (await conn.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar()
+
+    async def _replica_factories(self) -> tuple[async_sessionmaker, async_sessionmaker]:
+        """Read factories of the next replica, or of the primary if it may miss the client's write."""
+        replica, factories = next(self._replica_session_factories)
+        position = read_position.get()
+        if position is None or not position.committed_at:
+            return factories
+        elapsed = time.time() - position.committed_at
+        if elapsed >= self._settings.replica_sticky_seconds or await self._caught_up(replica, position, elapsed):
+            return factories
+        return self._read_session_factories
+
+    @staticmethod
+    async def _caught_up(replica: AsyncEngine, position: ReadPosition, elapsed: float) -> bool:
+        """
+        Whether replica has replayed the write: by its replay LSN when the position has one,
+        otherwise by its measured lag. Replicas that report neither are never assumed caught up.
+        """
+        if replica.dialect.name != "postgresql":
+            return False
+        try:
+            async with replica.connect() as conn:
+                if position.lsn:
+                    return bool((await conn.execute(
+                        text("SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)"),
+                        {"lsn": position.lsn}
+                    )).scalar())
+                lag = (await conn.execute(text(REPLICA_LAG_SQL))).scalar()
+        except (OSError, exc.DBAPIError):
+            return False
+        return lag is not None and float(lag) < elapsed
+
+    async def _ensure_tables(self) -> None:
+        if self._create_db and not self._tables_created:
+            await self.create_tables()
+            self._tables_created = True
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Runs callback once the current unit of work commits, or right away if none is active."""
+        session = self._current_session.get()
+        if session is None:
+            callback()
+            return
+        session.info.setdefault("after_commit", []).append(callback)
+
+    async def after_commit_async(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """
+        Awaits callback once the current unit of work commits, or right away if none is active.
+
+        Callbacks of both kinds run in the order they were registered, after the transaction
+        has ended: work done by one is not part of the unit of work and holds none of its locks.
+        """
+        session = self._current_session.get()
+        if session is None:
+            await callback()
+            return
+        session.info.setdefault("after_commit", []).append(callback)
 
     async def create_tables(self):
         async with self._engine.begin() as conn:
@@ -0,0 +1,70 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+@dataclass
+class PoolStatistics:
+    acquisitions: int = 0
+    timeouts: int = 0
+    waiting: int = 0
+    total_acquire_time: float = 0.0
+    max_acquire_time: float = 0.0
+
+    def record_acquire(self, elapsed: float) -> None:
+        self.acquisitions += 1
+        self.total_acquire_time += elapsed
+        if elapsed > self.max_acquire_time:
+            self.max_acquire_time = elapsed
+
+    def as_dict(self, pool: AsyncAdaptedQueuePool) -> dict:
+        avg_acquire_time = self.total_acquire_time / self.acquisitions if self.acquisitions else 0.0
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "waiting": self.waiting,
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "avg_acquire_ms": round(avg_acquire_time * 1000, 3),
+            "max_acquire_ms": round(self.max_acquire_time * 1000, 3),
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statistics = PoolStatistics()
+
+    def _exhausted(self) -> bool:
+        """Whether a checkout would block: no idle connection and no overflow left."""
+        if self.checkedin() > 0 or self._max_overflow == -1:
+            return False
+        return self._overflow >= self._max_overflow
+
+    def _do_get(self):
+        statistics = self.statistics
+        blocked = self._exhausted()
+        if blocked:
+            statistics.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            statistics.timeouts += 1
+            raise
+        finally:
+            if blocked:
+                statistics.waiting -= 1
+        statistics.record_acquire(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.statistics = self.statistics
+        return pool
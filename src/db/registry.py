@@ -0,0 +1,44 @@
+from collections.abc import Callable
+
+from src.db.engine import DatabaseEngine
+
+PRIMARY = "primary"
+TEST = "test"
+
+
+class EngineRegistry:
+    """
+    Named database engines (primary, test) created on first use.
+
+    Factories are registered at startup; an engine is only built (and its pool opened) when a
+    repository first asks for it, and every engine built is disposed of on shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._factories: dict[str, Callable[[], DatabaseEngine]] = {}
+        self._engines: dict[str, DatabaseEngine] = {}
+        self.default = PRIMARY
+
+    def register(self, name: str, factory: Callable[[], DatabaseEngine]) -> None:
+        if name in self._engines:
+            raise RuntimeError(f"Engine {name} is already in use")
+        self._factories[name] = factory
+
+    def get(self, name: str | None = None) -> DatabaseEngine:
+        name = name or self.default
+        engine = self._engines.get(name)
+        if engine is None:
+            try:
+                factory = self._factories[name]
+            except KeyError:
+                raise KeyError(f"Engine {name} is not registered") from None
+            engine = self._engines[name] = factory()
+        return engine
+
+    async def dispose(self) -> None:
+        engines, self._engines = self._engines, {}
+        for engine in engines.values():
+            await engine.dispose()
+
+
+engine_registry = EngineRegistry()
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.engine.interfaces import CacheStats
+
+
+@dataclass
+class StatementCacheStatistics:
+    hits: int = 0
+    misses: int = 0
+    uncached: int = 0
+
+    def record(self, context: DefaultExecutionContext) -> None:
+        cache_hit = context.cache_hit
+        if cache_hit is CacheStats.CACHE_HIT:
+            self.hits += 1
+        elif cache_hit is CacheStats.CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
+
+    def as_dict(self, engine: Engine) -> dict:
+        cached = self.hits + self.misses
+        compiled_cache = engine._compiled_cache
+        return {
+            "size": len(compiled_cache) if compiled_cache is not None else 0,
+            "capacity": compiled_cache.capacity if compiled_cache is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_rate": round(self.hits / cached, 4) if cached else 0.0,
+        }
+
+
+def instrument_statement_cache(engine: Engine) -> StatementCacheStatistics:
+    """Counts compiled-SQL cache hits and misses of every statement executed on engine."""
+    statistics = StatementCacheStatistics()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statistics.record(context)
+
+    return statistics
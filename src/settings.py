@@ -1,7 +1,8 @@
+import json
 import os
 import sys
 from functools import lru_cache
-from typing import TypeVar
+from typing import Literal, TypeVar
 
 import dotenv
 import rootpath
@@ -22,6 +23,11 @@ ROOT_DIR = rootpath.detect()
 ACCESS_TOKEN_EXPIRE_DAYS = os.getenv("ACCESS_TOKEN_EXPIRE_DAYS")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
+# PEM keys for RS*/ES*/PS* algorithms; JWT_PUBLIC_KEYS is a JSON object {kid: PEM} of keys still accepted after rotation
+JWT_PRIVATE_KEY = os.getenv("JWT_PRIVATE_KEY")
+JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")
+JWT_KEY_ID = os.getenv("JWT_KEY_ID")
+JWT_PUBLIC_KEYS = json.loads(os.getenv("JWT_PUBLIC_KEYS") or "null")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -54,6 +60,23 @@ class DatabaseSettings(BaseSettings):
     port: str
     db: str
     url: PostgresDsn | None = None
+    # read-only repository methods are spread over these; empty keeps everything on url
+    replica_urls: list[PostgresDsn] = []
+    # after a committed write the client reads from the primary for at most this long, less once a
+    # replica has replayed the write
+    replica_sticky_seconds: float = 2.0
+    # engine repositories use by default: primary or test; unset keeps the DEBUG switch
+    default_engine: Literal["primary", "test"] | None = None
+
+    pool_enabled: bool = True
+    pool_size: int = 5
+    pool_max_overflow: int = 10
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
+    pool_timeout: float = 30.0
+    # compiled SQL kept per engine, and server-side prepared statements kept per asyncpg connection
+    query_cache_size: int = 500
+    prepared_statement_cache_size: int = 100
 
     @field_validator("url")
     def get_postgres_dsn(
@@ -73,6 +96,42 @@ class DatabaseSettings(BaseSettings):
         )
 
 
+class CacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=f"{ROOT_DIR}/.env",
+        env_file_encoding="utf-8",
+        env_prefix="cache_",
+        extra="allow",
+    )
+
+    events_maxsize: int = 1024
+    events_ttl: float = 30.0
+    users_maxsize: int = 4096
+    users_ttl: float = 60.0
+
+
+class AuthSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=f"{ROOT_DIR}/.env",
+        env_file_encoding="utf-8",
+        env_prefix="auth_",
+        extra="allow",
+    )
+
+    # authorize from the user id/role claims of the access token instead of loading the user
+    stateless: bool = False
+    # in stateless mode a role change or deletion only takes effect once the access token expires
+    stateless_access_token_expire_minutes: int = 15
+    # threads that hash and verify passwords off the event loop
+    password_hash_workers: int = 4
+    # how often each worker pulls new revocations into its in-memory denylist
+    denylist_sync_interval: float = 5.0
+    # expired revocations are deleted from the table every N sync rounds
+    denylist_sweep_every: int = 60
+    # every N sync rounds all unexpired revocations are re-read, catching ones committed out of id order
+    denylist_full_sync_every: int = 12
+
+
 @lru_cache
 def get_settings(cls: type[TSettings]) -> TSettings:
     return cls()
@@ -98,6 +157,12 @@ logger.add(
 
 class JWTSettings(BaseModel):
     authjwt_secret_key: str = SECRET_KEY
+    authjwt_algorithm: str = ALGORITHM or "HS256"
+    authjwt_private_key: str | None = JWT_PRIVATE_KEY
+    authjwt_public_key: str | None = JWT_PUBLIC_KEY
+    authjwt_key_id: str | None = JWT_KEY_ID
+    authjwt_public_keys: dict[str, str] | None = JWT_PUBLIC_KEYS
+    authjwt_denylist_enabled: bool = True
 
 
 @AuthJWT.load_config
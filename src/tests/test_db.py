@@ -0,0 +1,177 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, text
+from starlette import status
+from starlette.testclient import TestClient
+
+from main import get_application
+from src.core.domain.events.dto import EventCreate
+from src.core.domain.events.models import Event
+from src.core.domain.events.repository import EventRepository
+from src.core.domain.users.cache import users_cache
+from src.core.domain.users.requests import RegisterUser
+from src.db.consistency import COOKIE_NAME, ReadPosition, read_position
+from src.db.engine import Base, DatabaseEngine
+from src.db.registry import engine_registry
+from src.settings import DatabaseSettings, get_settings
+
+
+async def replicated_engine(monkeypatch, tmp_path) -> DatabaseEngine:
+    """Primary and one replica, each its own SQLite file, serving every repository."""
+    db = DatabaseEngine(
+        f'sqlite+aiosqlite:///{tmp_path}/primary.db',
+        debug=False,
+        replica_urls=[f'sqlite+aiosqlite:///{tmp_path}/replica.db'],
+    )
+    for engine in (db._engine, *db._replicas):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(engine_registry, 'get', lambda name=None: db)
+    return db
+
+
+async def create_events(engine, *names: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(Event.__table__.insert(), [
+            {'name': name, 'started_at': datetime(2100, 1, 1, 10), 'finished_at': datetime(2100, 1, 1, 12)}
+            for name in names
+        ])
+
+
+def new_event(name: str) -> EventCreate:
+    return EventCreate(name=name, started_at=datetime(2100, 1, 1, 10), finished_at=datetime(2100, 1, 1, 12))
+
+
+@pytest.mark.asyncio
+async def test_pool_waiting(monkeypatch, tmp_path):
+    settings = get_settings(DatabaseSettings)
+    monkeypatch.setattr(settings, 'pool_size', 1)
+    monkeypatch.setattr(settings, 'pool_max_overflow', 0)
+    db = DatabaseEngine(f'sqlite+aiosqlite:///{tmp_path}/pool.db', debug=False)
+
+    async def checkout():
+        async with db._engine.connect() as conn:
+            await conn.execute(text('select 1'))
+
+    # checkouts served straight from the pool, even ones opening a connection, never count as waiting
+    waiting_on_connect = []
+    event.listen(
+        db._engine.sync_engine,
+        'connect',
+        lambda *args: waiting_on_connect.append(db.pool_statistics()['waiting'])
+    )
+    await checkout()
+    await checkout()
+    assert db.pool_statistics()['waiting'] == 0
+    assert db.pool_statistics()['acquisitions'] == 2
+    assert waiting_on_connect == [0]
+
+    async with db._engine.connect() as conn:
+        await conn.execute(text('select 1'))
+        assert db.pool_statistics()['waiting'] == 0
+        blocked = asyncio.create_task(checkout())
+        await asyncio.sleep(0.1)
+        assert db.pool_statistics()['waiting'] == 1
+    await blocked
+    assert db.pool_statistics()['waiting'] == 0
+    await db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_statement_cache(monkeypatch, tmp_path):
+    db = await replicated_engine(monkeypatch, tmp_path)
+    await create_events(db._replicas[0], 'Реплика')
+
+    before = db.statement_cache_statistics()[1]
+
+    # the read is routed to the replica; the second call reuses the SQL compiled by the first
+    repository = EventRepository()
+    assert (await repository.get_by_id(1)).name == 'Реплика'
+    assert (await repository.get_by_id(1)).name == 'Реплика'
+
+    primary, replica = db.statement_cache_statistics()
+    assert primary['engine'] == 'primary' and primary['hits'] == primary['misses'] == 0
+    assert replica['engine'] == 'replica'
+    assert replica['misses'] - before['misses'] == 1
+    assert replica['hits'] - before['hits'] == 1
+    await db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_routing(monkeypatch, tmp_path):
+    db = await replicated_engine(monkeypatch, tmp_path)
+    await create_events(db._engine, 'Основная')
+    await create_events(db._replicas[0], 'Реплика')
+
+    # reads of a client that has not written go to the replica, writes to the primary
+    assert (await EventRepository().get_by_id(1)).name == 'Реплика'
+    await EventRepository().create(new_event('Новое'))
+    assert await EventRepository().get_by_id(2) is None
+    async with db._engine.connect() as conn:
+        assert (await conn.execute(text('select count(*) from events'))).scalar() == 2
+    await db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_unit_of_work(monkeypatch, tmp_path):
+    db = await replicated_engine(monkeypatch, tmp_path)
+
+    async with db.unit_of_work():
+        assert await EventRepository().get_by_id(1) is None
+        await EventRepository().create(new_event('Новое'))
+        # once the unit of work has written, its reads join it instead of going to the replica
+        assert (await EventRepository().get_by_id(1)).name == 'Новое'
+    assert await EventRepository().get_by_id(1) is None
+    await db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_sticky_window(monkeypatch, tmp_path):
+    db = await replicated_engine(monkeypatch, tmp_path)
+    position = ReadPosition()
+    token = read_position.set(position)
+    try:
+        await EventRepository().create(new_event('Новое'))
+        assert position.committed_at > 0
+        # the writing client reads from the primary within the window
+        assert (await EventRepository().get_by_id(1)).name == 'Новое'
+
+        # another client is not held to it
+        other = read_position.set(ReadPosition())
+        assert await EventRepository().get_by_id(1) is None
+        read_position.reset(other)
+
+        # nor is the writer, once the window has passed
+        position.committed_at -= get_settings(DatabaseSettings).replica_sticky_seconds
+        assert await EventRepository().get_by_id(1) is None
+    finally:
+        read_position.reset(token)
+    await db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_read_position_cookie(monkeypatch, tmp_path):
+    db = await replicated_engine(monkeypatch, tmp_path)
+    client = TestClient(get_application())
+
+    response = client.post(url='/api/v1/user/register', json=RegisterUser(
+        first_name='Реплика',
+        username='replica_5120',
+        password='password'
+    ).model_dump())
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert ReadPosition.decode(client.cookies[COOKIE_NAME]).committed_at > 0
+    headers = {'Authorization': 'Bearer ' + response.json()['access_token']}
+
+    # the user exists only on the primary: it is found while the cookie is sent back
+    users_cache.invalidate()
+    response = client.get(url='/api/v1/user/event', headers=headers)
+    assert response.status_code != status.HTTP_401_UNAUTHORIZED, response.text
+
+    users_cache.invalidate()
+    client.cookies.clear()
+    response = client.get(url='/api/v1/user/event', headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+    await db.dispose()
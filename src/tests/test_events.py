@@ -1,14 +1,27 @@
+import csv
+import io
+import json
 from datetime import datetime, timedelta
 
 import pytest
 from loguru import logger
+from sqlalchemy import event as sa_event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from starlette.testclient import TestClient
 
 from main import get_application
+from src.core.domain import get_db_engine
+from src.core.domain.events.event_members.service import EventMemberService
+from src.core.domain.events.models import DataVersion, Event
+from src.core.domain.events.repository import VERSION_SCOPE
+from src.core.domain.events.requests import CreateEvent
+from src.core.domain.events.service import EventService
+from src.core.domain.users.dto import UpdateUser
 from src.core.domain.users.requests import AuthUser
+from src.core.domain.users.service import UserService
 from src.tests.configs import base_headers
-from src.tests.test_users import create_user, create_admin, signin
+from src.tests.test_users import create_user, create_admin, register_and_headers, signin
 
 app = get_application()
 
@@ -33,6 +46,215 @@ async def test_event_api():
     get_event()
 
 
+@pytest.mark.asyncio
+async def test_events_pagination():
+    started_at = datetime(2100, 1, 1, 10, 0)
+    for day in range(5):
+        await EventService().create(CreateEvent(
+            name=f'Собрание {day}',
+            started_at=started_at + timedelta(days=day),
+            finished_at=started_at + timedelta(days=day, hours=2)
+        ))
+    params = {'from': '2100-01-01T00:00:00', 'to': '2100-01-31T00:00:00', 'limit': 2}
+    names = []
+    while True:
+        response = client.get(url=route, params=params)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert len(response.json()) <= 2
+        names += [event['name'] for event in response.json()]
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        params['cursor'] = response.headers['X-Next-Cursor']
+    assert names == [f'Собрание {day}' for day in range(5)]
+
+    async with get_db_engine().unit_of_work() as session:
+        session.add(Event(name='Без даты'))
+    params = {'limit': 2}
+    while True:
+        response = client.get(url=route, params=params)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert all(event['name'] != 'Без даты' for event in response.json())
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        params['cursor'] = response.headers['X-Next-Cursor']
+
+    response = client.get(url=route, params={'cursor': 'broken'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+
+
+@pytest.mark.asyncio
+async def test_events_etag():
+    response = client.get(url=route)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    response = client.get(url=route, headers={'If-None-Match': etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED, response.text
+    assert response.headers['ETag'] == etag
+    assert not response.content
+
+    event = await EventService().create(CreateEvent(
+        name='Новое собрание',
+        started_at=datetime(2100, 2, 1, 10, 0),
+        finished_at=datetime(2100, 2, 1, 12, 0)
+    ))
+    response = client.get(url=route, headers={'If-None-Match': etag})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.headers['ETag'] != etag
+
+    etag = response.headers['ETag']
+    await EventService().delete(event.id)
+    response = client.get(url=route, headers={'If-None-Match': etag})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.headers['ETag'] != etag
+
+
+
+@pytest.mark.asyncio
+async def test_events_version():
+    repository = EventService()._repository
+    stamp = await repository.get_stamp()
+
+    # the counter is bumped after the writing transaction, which never touches its row
+    async with get_db_engine().unit_of_work() as session:
+        await EventService().create(CreateEvent(
+            name='Версия',
+            started_at=datetime(2100, 4, 1, 10, 0),
+            finished_at=datetime(2100, 4, 1, 12, 0)
+        ))
+        version = await session.scalar(select(DataVersion.version).where(DataVersion.scope == VERSION_SCOPE))
+        assert (version or 0) == stamp
+    assert await repository.get_stamp() == stamp + 1
+
+    # member lists show first names, so renaming a user is a new version as well
+    register_and_headers('nina_4417', 'Нина')
+    user = await UserService().get_by_username('nina_4417')
+    etag = client.get(url=route).headers['ETag']
+    await UserService().update(UpdateUser(first_name='Нина Петровна', username='nina_4417'), user)
+    assert await repository.get_stamp() == stamp + 2
+    response = client.get(url=route, headers={'If-None-Match': etag})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.headers['ETag'] != etag
+
+
+@pytest.mark.asyncio
+async def test_events_export():
+    headers = await admin_headers('admin_export')
+    event = await EventService().create(CreateEvent(
+        name='Выгрузка',
+        started_at=datetime(2100, 3, 1, 10, 0),
+        finished_at=datetime(2100, 3, 1, 12, 0)
+    ))
+    user_headers, _ = register_and_headers('olga_7310', 'Ольга')
+    user = await UserService().get_by_username('olga_7310')
+    await EventMemberService().create(event_id=event.id, user_id=user.id)
+
+    response = client.get(url=f'{route}export', headers=user_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+    response = client.get(url=f'{route}export', headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.headers['Content-Type'].startswith('application/x-ndjson')
+    events = [json.loads(line) for line in response.text.splitlines()]
+    exported = next(item for item in events if item['id'] == event.id)
+    assert exported['name'] == 'Выгрузка'
+    assert exported['members'] == [{'name': 'Ольга'}]
+
+    response = client.get(url=f'{route}export', params={'format': 'csv'}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.headers['Content-Type'].startswith('text/csv')
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ['id', 'name', 'started_at', 'finished_at', 'members']
+    assert [str(event.id), 'Выгрузка', '2100-03-01T10:00:00', '2100-03-01T12:00:00', 'Ольга'] in rows
+    assert len(rows) == len(events) + 1
+
+    # the export is the full catalogue, including events whose dates were never set
+    undated = next(item for item in events if item['name'] == 'Без даты')
+    assert undated['started_at'] is None and undated['finished_at'] is None
+    assert [str(undated['id']), 'Без даты', '', '', ''] in rows
+
+
+@pytest.mark.asyncio
+async def test_events_export_transaction(monkeypatch):
+    headers = await admin_headers('admin_export_tx')
+    isolation_levels = []
+    stream = AsyncSession.stream
+
+    async def recording_stream(self, *args, **kwargs):
+        isolation_levels.append(self.bind.get_execution_options().get('isolation_level'))
+        return await stream(self, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncSession, 'stream', recording_stream)
+    response = client.get(url=f'{route}export', headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    # server-side cursors need a transaction: the export must not run on an autocommit connection
+    assert len(isolation_levels) == 1
+    assert isolation_levels[0] != 'AUTOCOMMIT'
+
+
+@pytest.mark.asyncio
+async def test_events_bulk():
+    headers = await admin_headers('admin_bulk')
+    item = {'started_at': '2100-04-01T10:00:00', 'finished_at': '2100-04-01T12:00:00'}
+    response = client.post(
+        url=f'{route}bulk',
+        headers=headers,
+        json=[{**item, 'name': 'Пакет 1'}, {**item, 'started_at': 'вчера'}, {**item, 'name': 'Пакет 2'}]
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    result = response.json()
+    assert len(result['created']) == 2
+    assert [error['index'] for error in result['errors']] == [1]
+    assert {error['loc'][0] for error in result['errors'][0]['detail']} == {'name', 'started_at'}
+    for event_id, name in zip(result['created'], ['Пакет 1', 'Пакет 2']):
+        assert (await EventService().get(event_id)).name == name
+
+    response = client.post(url=f'{route}bulk', headers=headers, json=[item, {'name': 'Пакет 3'}])
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, response.text
+    assert response.json()['created'] == []
+    assert [error['index'] for error in response.json()['errors']] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_events_members_batched():
+    started_at = datetime(2100, 6, 1, 10, 0)
+    names = ['Вера', 'Глеб', 'Дина']
+    event_ids = []
+    for day, name in enumerate(names):
+        event = await EventService().create(CreateEvent(
+            name=f'Встреча {day}',
+            started_at=started_at + timedelta(days=day),
+            finished_at=started_at + timedelta(days=day, hours=2)
+        ))
+        register_and_headers(f'member_{day}_8630', name)
+        user = await UserService().get_by_username(f'member_{day}_8630')
+        await EventMemberService().create(event_id=event.id, user_id=user.id)
+        event_ids.append(event.id)
+
+    statements = []
+    engine = get_db_engine()._engine.sync_engine
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url=route, params={'from': '2100-06-01T00:00:00', 'to': '2100-06-30T00:00:00'})
+    finally:
+        sa_event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert [event['members'] for event in response.json()] == [[{'name': name}] for name in names]
+    # one query for the page and one for all of its members, however many events the page has
+    assert len([statement for statement in statements if 'event_members' in statement]) == 1
+
+
+async def admin_headers(username: str) -> dict:
+    admin = await create_admin(username)
+    admin_token = signin(AuthUser(
+        username=admin.username,
+        password='password'
+    ))
+    return {**base_headers, 'Authorization': 'Bearer ' + admin_token}
+
+
 def get_events():
     response = client.get(
         url=route,
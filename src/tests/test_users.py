@@ -1,12 +1,28 @@
+from datetime import datetime
+
+import jwt
 import pytest
 from loguru import logger
 from starlette import status
 from starlette.testclient import TestClient
 
+from src.common.container import container
+from src.common.fastapi_jwt_auth import AuthJWT
+from src.common.fastapi_jwt_auth import auth_jwt
+from src.core.domain.events.event_members.service import EventMemberService
+from src.core.domain.events.requests import CreateEvent
+from src.core.domain.events.service import EventService
+from src.core.domain import get_db_engine
 from src.core.domain.roles.dto import RoleEnum
+from src.core.domain.tokens.denylist import token_denylist
+from src.core.domain.tokens.models import RevokedToken
+from src.core.domain.tokens.repository import SYNC_OVERLAP_IDS
+from src.core.domain.tokens.service import TokenService
 from src.core.domain.users.requests import RegisterUser, AuthUser
 from main import get_application
+from src.core.domain.users.cache import users_cache
 from src.core.domain.users.service import UserService
+from src.settings import AuthSettings, get_settings
 from src.tests.configs import base_headers
 
 app = get_application()
@@ -22,6 +38,222 @@ async def test_users_api():
     create_admin_by_user(user_token)
     await create_admin_by_admin()
     signin_bad_credentials()
+    signin_wrong_password()
+
+
+@pytest.mark.asyncio
+async def test_users_cache():
+    headers, _ = register_and_headers('anna_5521', 'Анна')
+
+    hits = users_cache.hits
+    for _ in range(2):
+        response = client.get(url=f'{route}/event', headers=headers)
+        assert response.status_code != status.HTTP_401_UNAUTHORIZED, response.text
+    assert users_cache.hits == hits + 1
+
+    user = await UserService().get_by_username('anna_5521')
+    await UserService().delete(user.id)
+    response = client.get(url=f'{route}/event', headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+
+
+@pytest.mark.asyncio
+async def test_users_stateless(monkeypatch):
+    monkeypatch.setattr(get_settings(AuthSettings), 'stateless', True)
+    headers, _ = register_and_headers('oleg_8812', 'Олег')
+
+    async def no_lookup(*args, **kwargs):
+        raise AssertionError('stateless auth must not load the user')
+
+    monkeypatch.setattr(UserService, 'get_by_username', no_lookup)
+    response = client.get(url=f'{route}/event', headers=headers)
+    assert response.status_code != status.HTTP_401_UNAUTHORIZED, response.text
+    response = client.post(
+        url=f'{route}/register/admin',
+        headers=headers,
+        json=RegisterUser(first_name='Олег', username='oleg_8813', password='password').model_dump()
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+
+@pytest.mark.asyncio
+async def test_users_refresh():
+    _, tokens = register_and_headers('irina_3071', 'Ирина')
+    headers = {**base_headers, 'Authorization': 'Bearer ' + tokens['refresh_token']}
+
+    hits = AuthJWT.token_cache_statistics()['hits']
+    for _ in range(2):
+        response = client.post(url=f'{route}/refresh', headers=headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+    # the first refresh verifies the signature once, everything after is served from the cache
+    assert AuthJWT.token_cache_statistics()['hits'] >= hits + 3
+
+    AuthJWT.evict_token(headers['Authorization'].split()[1])
+    misses = AuthJWT.token_cache_statistics()['misses']
+    response = client.post(url=f'{route}/refresh', headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert AuthJWT.token_cache_statistics()['misses'] == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_users_logout():
+    headers, tokens = register_and_headers('pavel_6240', 'Павел')
+
+    response = client.get(url=f'{route}/event', headers=headers)
+    assert response.status_code != status.HTTP_401_UNAUTHORIZED, response.text
+    response = client.post(
+        url=f'{route}/logout',
+        headers=headers,
+        json={'refresh_token': tokens['refresh_token']}
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT, response.text
+
+    response = client.get(url=f'{route}/event', headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+    response = client.post(
+        url=f'{route}/refresh',
+        headers={**base_headers, 'Authorization': 'Bearer ' + tokens['refresh_token']}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+
+
+
+@pytest.mark.asyncio
+async def test_users_denylist_out_of_order():
+    service = container.resolve(TokenService)
+    await service.sync()
+    expires_at = datetime(2100, 1, 1)
+    high_id = token_denylist.last_id + SYNC_OVERLAP_IDS * 10
+    low_id = high_id - SYNC_OVERLAP_IDS * 5
+
+    # the row with the higher id commits and is synced first
+    async with get_db_engine().unit_of_work() as session:
+        session.add(RevokedToken(id=high_id, jti='late-id-early-commit', expires_at=expires_at))
+    await service.sync()
+    assert token_denylist.is_revoked('late-id-early-commit')
+
+    # the row allocated the lower id commits only afterwards, beyond the overlap
+    async with get_db_engine().unit_of_work() as session:
+        session.add(RevokedToken(id=low_id, jti='early-id-late-commit', expires_at=expires_at))
+    await service.sync()
+    assert not token_denylist.is_revoked('early-id-late-commit')
+
+    await service.sync(full=True)
+    assert token_denylist.is_revoked('early-id-late-commit')
+
+
+@pytest.mark.asyncio
+async def test_users_container_override():
+    class EmptyEventMemberService(EventMemberService):
+        async def get_all(self, user_id: int):
+            return []
+
+    headers, _ = register_and_headers('maria_1934', 'Мария')
+    with container.override(EventMemberService, EmptyEventMemberService()):
+        response = client.get(url=f'{route}/event', headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json() == []
+    assert container.resolve(UserService) is container.resolve(UserService)
+
+
+@pytest.mark.asyncio
+async def test_users_token_algorithms(monkeypatch):
+    headers, tokens = register_and_headers('nikita_2207', 'Никита')
+    claims = jwt.decode(tokens['refresh_token'], verify=False)
+    for algorithm, key in (('none', None), ('HS512', AuthJWT._secret_key)):
+        forged = jwt.encode(claims, key, algorithm=algorithm).decode()
+        response = client.get(url=f'{route}/event', headers={**base_headers, 'Authorization': 'Bearer ' + forged})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+        response = client.post(url=f'{route}/logout', headers=headers, json={'refresh_token': forged})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, response.text
+
+    decodes = []
+    decode = auth_jwt.jwt.decode
+    monkeypatch.setattr(AuthJWT, '_token_cache_maxsize', 0)
+    monkeypatch.setattr(auth_jwt.jwt, 'decode', lambda *args, **kwargs: decodes.append(1) or decode(*args, **kwargs))
+    response = client.get(url=f'{route}/event', headers=headers)
+    assert response.status_code != status.HTTP_401_UNAUTHORIZED, response.text
+    # without the claims cache the access token signature is still checked only once
+    assert len(decodes) == 1
+
+
+@pytest.mark.asyncio
+async def test_users_key_rotation(monkeypatch):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    def pem_pair():
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+        public = key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        return private, public
+
+    headers, tokens = register_and_headers('sofia_4418', 'София')
+    (old_private, old_public), (private, public) = pem_pair(), pem_pair()
+    for name, value in (
+            ('_algorithm', 'RS256'), ('_decode_algorithms', ['RS256']),
+            ('_private_key', private), ('_public_key', public),
+            ('_key_id', 'key-2'), ('_public_keys', {'key-1': old_public}),
+            ('_prepared_keys', {}), ('_token_cache_maxsize', 0),
+    ):
+        monkeypatch.setattr(AuthJWT, name, value)
+
+    service = UserService()
+    token = service.issue_access_token(AuthJWT(), await service.get_by_username('sofia_4418'))
+    assert jwt.get_unverified_header(token)['kid'] == 'key-2'
+    response = client.get(url=f'{route}/event', headers={**base_headers, 'Authorization': 'Bearer ' + token})
+    assert response.status_code != status.HTTP_401_UNAUTHORIZED, response.text
+
+    claims = jwt.decode(token, verify=False)
+    old_token = jwt.encode(claims, old_private, algorithm='RS256', headers={'kid': 'key-1'}).decode()
+    response = client.get(url=f'{route}/event', headers={**base_headers, 'Authorization': 'Bearer ' + old_token})
+    assert response.status_code != status.HTTP_401_UNAUTHORIZED, response.text
+
+    prepared = len(AuthJWT._prepared_keys)
+    for kid in range(20):
+        unknown = jwt.encode(claims, old_private, algorithm='RS256', headers={'kid': f'key-x{kid}'}).decode()
+        response = client.get(url=f'{route}/event', headers={**base_headers, 'Authorization': 'Bearer ' + unknown})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+    response = client.get(url=f'{route}/event', headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+    assert len(AuthJWT._prepared_keys) == prepared
+
+    # symmetric keys ignore the kid, so arbitrary kids share the one prepared secret
+    monkeypatch.setattr(AuthJWT, '_algorithm', 'HS256')
+    monkeypatch.setattr(AuthJWT, '_decode_algorithms', ['HS256'])
+    access_claims = jwt.decode(tokens['access_token'], verify=False)
+    for kid in range(20):
+        token = jwt.encode(access_claims, AuthJWT._secret_key, algorithm='HS256', headers={'kid': str(kid)}).decode()
+        response = client.get(url=f'{route}/event', headers={**base_headers, 'Authorization': 'Bearer ' + token})
+        assert response.status_code != status.HTTP_401_UNAUTHORIZED, response.text
+    assert len(AuthJWT._prepared_keys) == prepared + 1
+
+
+@pytest.mark.asyncio
+async def test_users_enroll_idempotent():
+    headers, _ = register_and_headers('timur_5902', 'Тимур')
+    event = await EventService().create(CreateEvent(
+        name='Повторная запись',
+        started_at=datetime(2100, 5, 1, 10, 0),
+        finished_at=datetime(2100, 5, 1, 12, 0)
+    ))
+    response = client.post(url=f'{route}/event/{event.id}', headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    enrollment = response.json()
+    assert enrollment['event_id'] == event.id
+
+    response = client.post(url=f'{route}/event/{event.id}', headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json() == enrollment
+    members = await EventMemberService().get_members_by_event_id(event.id)
+    assert [member.id for member in members] == [enrollment['id']]
 
 
 @pytest.mark.asyncio
@@ -41,6 +273,24 @@ def create_user():
     return response.json()['access_token']
 
 
+@pytest.mark.asyncio
+def register_and_headers(username: str, first_name: str = 'Тест') -> tuple[dict, dict]:
+    """Registers a user and returns request headers with its access token, and both tokens."""
+    request = RegisterUser(
+        first_name=first_name,
+        username=username,
+        password='password'
+    )
+    response = client.post(
+        url=f'{route}/register',
+        headers={"Content-Type": "application/json"},
+        json=request.model_dump()
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    tokens = response.json()
+    return {**base_headers, 'Authorization': 'Bearer ' + tokens['access_token']}, tokens
+
+
 @pytest.mark.asyncio
 def create_admin_by_user(user_token):
     request = RegisterUser(
@@ -96,6 +346,21 @@ def signin_bad_credentials():
     logger.error('Bad credentials')
 
 
+@pytest.mark.asyncio
+def signin_wrong_password():
+    request = AuthUser(
+        username='egor_113443',
+        password='passwOrt'
+    )
+    response = client.post(
+        url=f'{route}/signin',
+        headers={"Content-Type": "application/json"},
+        json=request.model_dump()
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+    logger.error('Wrong password')
+
+
 @pytest.mark.asyncio
 def signin(request: AuthUser | None = None):
     if request is None:
@@ -114,10 +379,10 @@ def signin(request: AuthUser | None = None):
 
 
 @pytest.mark.asyncio
-async def create_admin():
+async def create_admin(username: str = 'dima_4166554'):
     request = RegisterUser(
         first_name='Дмитрий',
-        username='dima_4166554',
+        username=username,
         password='password'
     )
     return await UserService().register(request=request, role_name=RoleEnum.ADMIN.name)